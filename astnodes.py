@@ -0,0 +1,177 @@
+# Nodes of the Abstract syntax tree made by the Lexer and turned into C code by the CGenerator.
+# Values and expressions are stored as C code strings.
+
+class Node:
+	__slots__ = ("line",)
+
+	def __init__(self, line):
+		self.line = line
+
+	def __repr__(self):
+		fields = ", ".join(f"{i}={getattr(self, i)!r}" for i in self.get_fields())
+		return f"{type(self).__name__}({fields})"
+
+	@classmethod
+	def get_fields(cls):
+		""" Returns the names of all the fields of the node, Including the fields of its base classes. """
+		fields = []
+		for i in reversed(cls.__mro__):
+			fields.extend(getattr(i, "__slots__", ()))
+		return fields
+
+class RawCode(Node):
+	""" Code written to the output as it is. Used for comments and unknown commands. """
+	__slots__ = ("code",)
+
+	def __init__(self, line, code):
+		super().__init__(line)
+		self.code = code
+
+class Block(Node):
+	""" a List of statements. Written inside braces If scoped is True, Otherwise in place. """
+	__slots__ = ("body", "scoped")
+
+	def __init__(self, line, body, scoped=False):
+		super().__init__(line)
+		self.body = body
+		self.scoped = scoped
+
+class VariableDeclaration(Node):
+	"""
+	[FIELDS]
+	name = Variable name
+	vartype = Variable type (Types)
+	ctype = The C type name written in the output
+	value = Initial value. None If declared without a value.
+	is_heap = Is the variable heap allocated or not.
+	size = String size or Dynamic memory size in bytes. None for other types.
+	check_capacity = Keep the capacity of the heap string in a variable, To check it at runtime when the string is set.
+	valtype = Type of the value held by a Dynamic (Types). None for other types.
+	"""
+	__slots__ = ("name", "vartype", "ctype", "value", "is_heap", "size", "check_capacity", "valtype")
+
+	def __init__(self, line, name, vartype, ctype, value=None, is_heap=False, size=None, check_capacity=False, valtype=None):
+		super().__init__(line)
+		self.name = name
+		self.vartype = vartype
+		self.ctype = ctype
+		self.value = value
+		self.is_heap = is_heap
+		self.size = size
+		self.check_capacity = check_capacity
+		self.valtype = valtype
+
+class Assignment(Node):
+	"""
+	[FIELDS]
+	name = Variable name
+	operator = "=" or the arithmetic operator of a compound assignment ("+", "-", "*", "/", "%")
+	value = The new value
+	vartype = Variable type (Types)
+	is_heap = Is the variable heap allocated or not.
+	size = String length, Including the null terminator. None for other types.
+	reallocate = Reallocate the heap string to capacity before setting it.
+	capacity = Bytes allocated for the string after the assignment. None for other types.
+	check_capacity = Check the capacity of the heap string at runtime, And grow or shrink it If needed, Instead of reallocate.
+	valtype = Type of the value held by a Dynamic (Types). None for other types.
+	"""
+	__slots__ = ("name", "operator", "value", "vartype", "is_heap", "size", "reallocate", "capacity", "check_capacity", "valtype")
+
+	def __init__(self, line, name, operator, value, vartype, is_heap=False, size=None, reallocate=False, capacity=None, check_capacity=False, valtype=None):
+		super().__init__(line)
+		self.name = name
+		self.operator = operator
+		self.value = value
+		self.vartype = vartype
+		self.is_heap = is_heap
+		self.size = size
+		self.reallocate = reallocate
+		self.capacity = capacity
+		self.check_capacity = check_capacity
+		self.valtype = valtype
+
+class Comparison(Node):
+	""" a Single condition. operator and right are None If the condition is a single value. """
+	__slots__ = ("left", "operator", "right", "is_string")
+
+	def __init__(self, line, left, operator=None, right=None, is_string=False):
+		super().__init__(line)
+		self.left = left
+		self.operator = operator
+		self.right = right
+		self.is_string = is_string
+
+class IfStatement(Node):
+	"""
+	[FIELDS]
+	conditions = List of Comparison
+	connectives = "and" or "or" between each Comparison
+	body = Statements run If the conditions are true
+	else_body = Statements run otherwise. None If there's no else block.
+	"""
+	__slots__ = ("conditions", "connectives", "body", "else_body")
+
+	def __init__(self, line, conditions, connectives, body, else_body=None):
+		super().__init__(line)
+		self.conditions = conditions
+		self.connectives = connectives
+		self.body = body
+		self.else_body = else_body
+
+class LoopFor(Node):
+	__slots__ = ("count", "body")
+
+	def __init__(self, line, count, body):
+		super().__init__(line)
+		self.count = count
+		self.body = body
+
+class SwitchStatement(Node):
+	"""
+	[FIELDS]
+	value = The value being tested
+	cases = List of (case key, statements)
+	default = Statements of the default case. None If there's no default case.
+	"""
+	__slots__ = ("value", "cases", "default")
+
+	def __init__(self, line, value, cases, default=None):
+		super().__init__(line)
+		self.value = value
+		self.cases = cases
+		self.default = default
+
+class Print(Node):
+	__slots__ = ("value",)
+
+	def __init__(self, line, value):
+		super().__init__(line)
+		self.value = value
+
+class Throw(Node):
+	__slots__ = ("code", "description")
+
+	def __init__(self, line, code, description):
+		super().__init__(line)
+		self.code = code
+		self.description = description
+
+class Delete(Node):
+	"""
+	[FIELDS]
+	name = Variable name
+	vartype = Variable type (Types)
+	"""
+	__slots__ = ("name", "vartype")
+
+	def __init__(self, line, name, vartype=None):
+		super().__init__(line)
+		self.name = name
+		self.vartype = vartype
+
+class Exit(Node):
+	__slots__ = ("code",)
+
+	def __init__(self, line, code):
+		super().__init__(line)
+		self.code = code
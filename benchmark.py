@@ -0,0 +1,268 @@
+from processor import parse_file, TRANSPILER_VERSION
+from time import perf_counter
+from random import Random
+import subprocess
+import tempfile
+import tracemalloc
+import argparse
+import json
+import sys
+import os
+
+PROCESSOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "processor.py")
+
+# Generators of synthetic StoryScript code, One for each construct used in main.sts.
+# Each takes a unique number used to name its variables and returns the lines of code.
+def generate_heap(k):
+	return [f"int heap ha{k}", f"int heap hb{k} = {k}", f"ha{k} = {k} + 20", f"del ha{k}", f"del hb{k}"]
+
+def generate_stack(k):
+	return [f"int sc{k}", f"var sd{k} = {k}", f"sc{k} = 25 + 20", f"sc{k} -= 5", f"sd{k} = sc{k} * 2"]
+
+def generate_string(k):
+	return [
+		f'string se{k} = "Hello world!"',
+		f"string heap sf{k} 20",
+		f'sf{k} = "0123456789abcdefghijklmnopqrstuvwxyz"',
+		f'se{k} = "Hello there!"',
+		f"del sf{k}"
+	]
+
+def generate_dynamic(k):
+	return [f'dynamic heap dg{k} = new Dynamic ("Hello there!")', f"dynamic dh{k} = new Dynamic (75)", f"dh{k} = new Dynamic (500)"]
+
+def generate_if(k):
+	return [
+		f"int id{k}",
+		f'string ie{k} = "Hello world!"',
+		f"if id{k} >= 60 and id{k} < 70 then if id{k} == 69 then print (\"The value of d is 69\") else print (\"The value of d is more than or equal to 60 and less than 70.\") end else print (\"The value of d is not more than or equal to 60 and less than 70.\") end",
+		f'if ie{k} == "Hello world!" then print ("the value of e is Hello world!") end'
+	]
+
+def generate_loopfor(k):
+	return ["loopfor 10 loopfor 10 print (\"ting\") end && print (\"owo\") end", "loopfor 3 print (\"spam ig\") end"]
+
+def generate_switch(k):
+	return [f"int wd{k}", f"switch wd{k} case 10: print (\"The value of d is 10\") break case 69: print (\"**SIXTYNINE**\") break default: print (\"other\") break end"]
+
+def generate_comment(k):
+	return [f"// Comment number {k}", ""]
+
+CONSTRUCTS = {
+	"heap": generate_heap,
+	"stack": generate_stack,
+	"string": generate_string,
+	"dynamic": generate_dynamic,
+	"if": generate_if,
+	"loopfor": generate_loopfor,
+	"switch": generate_switch,
+	"comment": generate_comment
+}
+
+def generate_script(line_count, mix, seed=0):
+	"""
+	Generate a synthetic StoryScript program.
+	[PARAMETERS]
+	line_count = Minimum number of lines to generate.
+	mix = Dict of construct name to its weight. See CONSTRUCTS.
+	seed = Seed of the random construct choice. The same seed generates the same program.
+	[RETURNS] a list of lines.
+	"""
+	random = Random(seed)
+	names = list(mix)
+	weights = [mix[i] for i in names]
+	lines = []
+	k = 0
+	while len(lines) < line_count:
+		lines.extend(CONSTRUCTS[random.choices(names, weights)[0]](k))
+		k += 1
+	return lines
+
+def parse_mix(text):
+	""" Parse a construct mix written as "heap=1,if=2". a Construct without a weight gets 1. """
+	mix = {}
+	for i in text.split(","):
+		name, _, weight = i.partition("=")
+		name = name.strip()
+		if name not in CONSTRUCTS:
+			raise argparse.ArgumentTypeError(f"Unknown construct {name}. Choose from: {', '.join(CONSTRUCTS)}")
+		mix[name] = float(weight) if weight else 1.0
+	return mix
+
+def run_once(in_file, out_file, measure_memory=False, options=None):
+	""" Transpile a file once. Returns (time elapsed, peak memory in bytes or None) """
+	if measure_memory:
+		tracemalloc.start()
+	start_time = perf_counter()
+	parse_file(out_file, in_file, quiet=True, **(options or {}))
+	elapsed = perf_counter() - start_time
+	peak = None
+	if measure_memory:
+		peak = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+	return elapsed, peak
+
+def run_benchmark(lines, repeat=3, constructs=None, mix=None, seed=0, script_dir=None, options=None):
+	"""
+	Measure the transpiler speed and memory usage on each construct, And on a mix of all of them.
+	[PARAMETERS]
+	lines = Number of lines in each generated program.
+	repeat = Number of timed runs. The fastest run is kept.
+	constructs = Names of the constructs to benchmark alone. Defaults to all constructs.
+	mix = Construct weights of the mixed program. Defaults to the same weight for every construct.
+	seed = Seed of the program generator.
+	script_dir = Directory to keep the generated programs in. Defaults to a temporary directory.
+	options = Keyword arguments passed to parse_file.
+	[RETURNS] Dict of benchmark name to its results.
+	"""
+	if constructs is None:
+		constructs = list(CONSTRUCTS)
+	if mix is None:
+		mix = {i: 1.0 for i in CONSTRUCTS}
+	programs = {i: {i: 1.0} for i in constructs}
+	programs["mixed"] = mix
+	results = {}
+	with tempfile.TemporaryDirectory() as temp_dir:
+		if script_dir is None:
+			script_dir = temp_dir
+		os.makedirs(script_dir, exist_ok=True)
+		out_file = os.path.join(temp_dir, "out.c")
+		for name, program_mix in programs.items():
+			in_file = os.path.join(script_dir, f"bench_{name}.sts")
+			script = generate_script(lines, program_mix, seed)
+			with open(in_file, "w") as f:
+				f.write("\n".join(script) + "\n")
+			# Memory is measured on its own run, tracemalloc slows down the timed runs.
+			_, peak = run_once(in_file, out_file, True, options)
+			best = min(run_once(in_file, out_file, False, options)[0] for _ in range(repeat))
+			results[name] = {
+				"lines": len(script),
+				"seconds": best,
+				"lines_per_second": len(script) / best,
+				"peak_memory": peak
+			}
+	return results
+
+def run_processor(arguments):
+	""" Run processor.py in a new Python process. Returns the time elapsed. """
+	start_time = perf_counter()
+	subprocess.run([sys.executable, PROCESSOR_PATH, *arguments], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+	return perf_counter() - start_time
+
+def measure_startup(lines, repeat=3, seed=0):
+	"""
+	Measure the fixed cost of running processor.py, And the cost of each line, With and without --release.
+	Startup is the time to transpile an empty file in a new process. The cost of each line is
+	the extra time a mixed program of the given lines takes, Divided by its number of lines.
+	[RETURNS] Dict of mode ("debug" or "release") to a dict of startup_seconds and per_line_seconds.
+	"""
+	results = {}
+	with tempfile.TemporaryDirectory() as temp_dir:
+		empty_file = os.path.join(temp_dir, "empty.sts")
+		program_file = os.path.join(temp_dir, "program.sts")
+		out_file = os.path.join(temp_dir, "out.c")
+		open(empty_file, "w").close()
+		script = generate_script(lines, {i: 1.0 for i in CONSTRUCTS}, seed)
+		with open(program_file, "w") as f:
+			f.write("\n".join(script) + "\n")
+		for mode, flags in (("debug", []), ("release", ["--release"])):
+			startup = min(run_processor(["-i", empty_file, "-o", out_file, "--no-cache", *flags]) for _ in range(repeat))
+			program = min(run_processor(["-i", program_file, "-o", out_file, "--no-cache", *flags]) for _ in range(repeat))
+			results[mode] = {
+				"startup_seconds": startup,
+				"per_line_seconds": max(program - startup, 0.0) / len(script)
+			}
+	return results
+
+def compare_startup(baseline, startup, threshold):
+	""" Returns a list of regression messages of the startup and per line costs. See compare_results. """
+	regressions = []
+	for mode, result in startup.items():
+		if mode not in baseline:
+			continue
+		for name, seconds in result.items():
+			old = baseline[mode][name]
+			if old and (seconds - old) / old * 100 > threshold:
+				regressions.append(f"{mode} {name}: {(seconds - old) / old * 100:.1f}% slower ({old:.6f} -> {seconds:.6f})")
+	return regressions
+
+def compare_results(baseline, results, threshold):
+	"""
+	Find the benchmarks that regressed from the baseline.
+	[PARAMETERS]
+	baseline = Results loaded from a saved baseline.
+	results = Results of the current run.
+	threshold = Maximum allowed slowdown or memory growth in percent.
+	[RETURNS] a list of regression messages. Empty If nothing regressed.
+	"""
+	regressions = []
+	for name, result in results.items():
+		if name not in baseline:
+			continue
+		old = baseline[name]
+		slowdown = (old["lines_per_second"] - result["lines_per_second"]) / old["lines_per_second"] * 100
+		if slowdown > threshold:
+			regressions.append(f"{name}: {slowdown:.1f}% fewer lines per second ({old['lines_per_second']:.0f} -> {result['lines_per_second']:.0f})")
+		if old["peak_memory"] and result["peak_memory"] is not None:
+			growth = (result["peak_memory"] - old["peak_memory"]) / old["peak_memory"] * 100
+			if growth > threshold:
+				regressions.append(f"{name}: {growth:.1f}% more peak memory ({old['peak_memory']} -> {result['peak_memory']} bytes)")
+	return regressions
+
+def print_results(results, baseline=None):
+	print(f"{'Benchmark':<10} {'Lines':>7} {'Seconds':>10} {'Lines/s':>10} {'Peak MB':>9} {'Change':>8}")
+	for name, result in results.items():
+		change = ""
+		if baseline is not None and name in baseline:
+			change = f"{(result['lines_per_second'] / baseline[name]['lines_per_second'] - 1) * 100:+.1f}%"
+		print(f"{name:<10} {result['lines']:>7} {result['seconds']:>10.4f} {result['lines_per_second']:>10.0f} {result['peak_memory'] / 10**6:>9.3f} {change:>8}")
+
+if __name__ == "__main__":
+	# python benchmark.py --save baseline.json
+	# python benchmark.py --compare baseline.json --threshold 10
+	parser = argparse.ArgumentParser(description="Measure the StoryScript transpiler speed and memory usage on generated programs.")
+	parser.add_argument("--lines", type=int, default=5000, help="Number of lines of each generated program.")
+	parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs of each program. The fastest run is kept.")
+	parser.add_argument("--seed", type=int, default=0, help="Seed of the program generator.")
+	parser.add_argument(
+		"--constructs",
+		nargs="+",
+		choices=list(CONSTRUCTS),
+		help="Constructs to benchmark alone. Defaults to all constructs."
+	)
+	parser.add_argument("--mix", type=parse_mix, help="Construct weights of the mixed program, e.g. \"heap=1,if=2,loopfor=1\".")
+	parser.add_argument("--script-dir", help="Keep the generated programs in this directory.")
+	parser.add_argument("--save", metavar="PATH", help="Save the results as a baseline.")
+	parser.add_argument("--compare", metavar="PATH", help="Compare the results with a saved baseline, Fail If anything regressed.")
+	parser.add_argument("--startup", action="store_true", help="Also measure the startup time and the cost of each line of processor.py, With and without --release.")
+	parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown or memory growth in percent before failing.")
+	args = parser.parse_args()
+
+	baseline = None
+	baseline_startup = {}
+	if args.compare:
+		with open(args.compare, "r") as f:
+			data = json.load(f)
+		baseline = data["results"]
+		baseline_startup = data.get("startup", {})
+	results = run_benchmark(args.lines, args.repeat, args.constructs, args.mix, args.seed, args.script_dir)
+	print(f"// StoryScript C Transpiler // Version {TRANSPILER_VERSION} // Benchmark")
+	print_results(results, baseline)
+	startup = {}
+	if args.startup:
+		startup = measure_startup(args.lines, args.repeat, args.seed)
+		print(f"{'Mode':<10} {'Startup s':>10} {'Per line us':>12}")
+		for mode, result in startup.items():
+			print(f"{mode:<10} {result['startup_seconds']:>10.4f} {result['per_line_seconds'] * 1e6:>12.2f}")
+	if args.save:
+		with open(args.save, "w") as f:
+			json.dump({"version": TRANSPILER_VERSION, "lines": args.lines, "seed": args.seed, "results": results, "startup": startup}, f, indent=4)
+		print(f"Saved the baseline to {args.save}")
+	if baseline is not None:
+		regressions = compare_results(baseline, results, args.threshold) + compare_startup(baseline_startup, startup, args.threshold)
+		if regressions:
+			print(f"Regressions beyond {args.threshold}%:")
+			for i in regressions:
+				print("  " + i)
+			raise SystemExit(1)
+		print(f"No regressions beyond {args.threshold}%.")
@@ -0,0 +1,142 @@
+from hashlib import sha256
+from shutil import copyfile
+import os
+
+SIZE_FILE = "size" # Name of the file holding the total size of the entries, In the cache directory
+EVICT_TARGET = 0.9 # Eviction frees the cache down to this fraction of max_size, So the next entries fit without walking it again
+
+class BuildCache:
+	"""
+	On-disk cache of transpiled C code. Entries are keyed by a hash of the input file bytes,
+	the transpiler options and the transpiler version (processor.get_transpiler_digest). When the cache grows past max_size bytes,
+	the least recently used entries are removed.
+	The total size of the entries is kept in the SIZE_FILE, So storing an entry only walks the cache when it may be too big.
+	Processes storing entries at the same time can make the total drift a little, Every walk counts it again.
+	"""
+	def __init__(self, cache_dir, max_size=64 * 1024 * 1024):
+		self.cache_dir = cache_dir
+		self.max_size = max_size
+		self.size_path = os.path.join(cache_dir, SIZE_FILE)
+
+	def make_key(self, file_name, version, *options):
+		""" Returns the cache key of a file transpiled with the options provided. """
+		digest = sha256()
+		digest.update(f"{version}\0{options!r}\0".encode())
+		with open(file_name, "rb") as f:
+			for chunk in iter(lambda: f.read(1 << 16), b""):
+				digest.update(chunk)
+		return digest.hexdigest()
+
+	def get_entry_path(self, key):
+		return os.path.join(self.cache_dir, key[:2], key + ".c")
+
+	def get(self, key):
+		""" Returns the cached output of the key. None If the key is not in the cache. """
+		path = self.get_entry_path(key)
+		try:
+			with open(path, "r") as f:
+				data = f.read()
+		except FileNotFoundError:
+			return None
+		try:
+			os.utime(path) # Mark the entry as recently used.
+		except OSError:
+			pass
+		return data
+
+	def get_file(self, key, out_file):
+		""" Copy the cached output of the key to out_file. Returns If the key was in the cache. """
+		path = self.get_entry_path(key)
+		try:
+			copyfile(path, out_file)
+		except FileNotFoundError:
+			return False
+		try:
+			os.utime(path) # Mark the entry as recently used.
+		except OSError:
+			pass
+		return True
+
+	def get_temp_path(self, key):
+		""" Returns a temporary path to write a new entry of the key to. """
+		path = self.get_entry_path(key)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		return f"{path}.{os.getpid()}.tmp"
+
+	def put(self, key, data):
+		""" Store the output of the key, Then evict old entries If the cache is too big. """
+		# Write to a temporary file first so other processes never read a partial entry.
+		temp_path = self.get_temp_path(key)
+		with open(temp_path, "w") as f:
+			f.write(data)
+		self.replace_entry(key, temp_path)
+
+	def put_file(self, key, file_name):
+		""" Store the content of file_name as the output of the key, Then evict old entries If the cache is too big. """
+		temp_path = self.get_temp_path(key)
+		copyfile(file_name, temp_path)
+		self.replace_entry(key, temp_path)
+
+	def replace_entry(self, key, temp_path):
+		""" Move a new entry in place, Then add its size to the total and evict old entries If the cache is too big. """
+		path = self.get_entry_path(key)
+		try:
+			old_size = os.path.getsize(path)
+		except FileNotFoundError:
+			old_size = 0
+		new_size = os.path.getsize(temp_path)
+		os.replace(temp_path, path)
+		total_size = self.read_total_size()
+		if total_size is None:
+			self.evict()
+			return
+		total_size += new_size - old_size
+		if total_size > self.max_size:
+			self.evict()
+		else:
+			self.write_total_size(total_size)
+
+	def read_total_size(self):
+		""" Returns the total size of the entries. None If it's not known yet. """
+		try:
+			with open(self.size_path, "r") as f:
+				return int(f.read())
+		except (FileNotFoundError, ValueError):
+			return None
+
+	def write_total_size(self, total_size):
+		temp_path = f"{self.size_path}.{os.getpid()}.tmp"
+		with open(temp_path, "w") as f:
+			f.write(str(total_size))
+		os.replace(temp_path, self.size_path)
+
+	def evict(self):
+		"""
+		Remove the least recently used entries until the cache fits in EVICT_TARGET of max_size.
+		Walks the whole cache, So it's only called when the total size is unknown or over max_size.
+		"""
+		entries = []
+		total_size = 0
+		for root, _, files in os.walk(self.cache_dir):
+			for name in files:
+				if not name.endswith(".c"):
+					continue
+				path = os.path.join(root, name)
+				try:
+					stat = os.stat(path)
+				except FileNotFoundError:
+					continue
+				entries.append((stat.st_mtime, stat.st_size, path))
+				total_size += stat.st_size
+		if total_size > self.max_size:
+			entries.sort()
+			target_size = self.max_size * EVICT_TARGET
+			for _, size, path in entries:
+				if total_size <= target_size:
+					break
+				try:
+					os.remove(path)
+				except FileNotFoundError:
+					pass
+				total_size -= size
+		self.write_total_size(total_size)
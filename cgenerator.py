@@ -0,0 +1,635 @@
+from filehelper import FileHelper
+from langEnums import Types
+from lexer import STRING_SHRINK_MINIMUM
+from optimizer import IDENTIFIER_REGEX, has_loop_control
+import astnodes as ast
+import math
+import re
+
+DEFAULT_LIBRARIES = ("stdio.h", "stdlib.h") # Included for raw C code, Which can call anything from them
+BOOLEAN_VALUES = {"true": "1", "false": "0"}
+STRING_DISPATCH_MINIMUM = 4 # if/else chains comparing a string with at least this many literals are dispatched by hash
+C_ESCAPES = {"n": 10, "t": 9, "r": 13, "a": 7, "b": 8, "f": 12, "v": 11, "\\": 92, "\"": 34, "'": 39, "?": 63}
+C_STRING_REGEX = re.compile(r'"(?:[^"\\\n]|\\.)*"')
+C_STRING_RUN_REGEX = re.compile(r'"(?:[^"\\\n]|\\.)*"(?:\s*"(?:[^"\\\n]|\\.)*")*') # Adjacent literals, Which C joins into one
+
+ATTRIBUTES_CODE = '''
+// Compiler hints
+#if defined(__GNUC__) || defined(__clang__)
+#define __STS_NORETURN __attribute__((noreturn, cold))
+#define __STS_LIKELY(x) __builtin_expect(!!(x), 1)
+#define __STS_UNLIKELY(x) __builtin_expect(!!(x), 0)
+#else
+#define __STS_NORETURN
+#define __STS_LIKELY(x) (x)
+#define __STS_UNLIKELY(x) (x)
+#endif
+'''
+
+EXCEPTION_RAISING_CODE = '''
+// Exception Raising
+static __STS_NORETURN void raiseException(int code, const char* description)
+{
+	switch(code)
+	{
+		case 100:
+			printf("InvalidSyntax: %s", description);
+			break;
+		case 101:
+			printf("AlreadyDefined: %s", description);
+			break;
+		case 102:
+			printf("NotImplementedException %s", description);
+			break;
+		case 103:
+			printf("NotDefinedException: %s", description);
+			break;
+		case 104:
+			printf("GeneralException: %s", description);
+			break;
+		case 105:
+			printf("DivideByZeroException: %s", description);
+			break;
+		case 106:
+			printf("InvalidValue: %s", description);
+			break;
+		case 107:
+			printf("InvalidTypeException: %s", description);
+			break;
+	}
+	exit(code);
+}
+'''
+
+DYNAMIC_CODE = '''
+// Dynamic values: a type tag from the Types of the transpiler, And the value.
+// Strings shorter than __STS_DYNAMIC_INLINE are stored inline, Longer ones point to a string literal,
+// Or to a copy owned by the Dynamic, Which is the only case allocating memory.
+#define __STS_DYNAMIC_INLINE 16
+enum __sts_type { ''' + ", ".join(f"__STS_{i.name} = {i.value}" for i in Types) + ''' };
+enum __sts_storage { __STS_STORED_INLINE, __STS_STORED_STATIC, __STS_STORED_OWNED };
+typedef struct
+{
+	unsigned char type; // enum __sts_type
+	unsigned char storage; // enum __sts_storage, For strings
+	union
+	{
+		long long integer; // Integer and Boolean
+		double floating;
+		char string[__STS_DYNAMIC_INLINE];
+		const char* pointer;
+	} as;
+} __sts_dynamic;
+
+static inline __sts_dynamic __sts_dynamic_int(long long value)
+{
+	__sts_dynamic d;
+	d.type = __STS_Integer;
+	d.storage = __STS_STORED_INLINE;
+	d.as.integer = value;
+	return d;
+}
+
+static inline __sts_dynamic __sts_dynamic_bool(int value)
+{
+	__sts_dynamic d;
+	d.type = __STS_Boolean;
+	d.storage = __STS_STORED_INLINE;
+	d.as.integer = value != 0;
+	return d;
+}
+
+static inline __sts_dynamic __sts_dynamic_float(double value)
+{
+	__sts_dynamic d;
+	d.type = __STS_Float;
+	d.storage = __STS_STORED_INLINE;
+	d.as.floating = value;
+	return d;
+}
+
+// The string must live as long as the Dynamic, Like a string literal.
+static inline __sts_dynamic __sts_dynamic_static_string(const char* value, size_t length)
+{
+	__sts_dynamic d;
+	d.type = __STS_String;
+	d.storage = __STS_STORED_STATIC;
+	if(length < __STS_DYNAMIC_INLINE)
+	{
+		d.storage = __STS_STORED_INLINE;
+		memcpy(d.as.string, value, length + 1);
+	}
+	else d.as.pointer = value;
+	return d;
+}
+
+static inline __sts_dynamic __sts_dynamic_string(const char* value, size_t length)
+{
+	if(length < __STS_DYNAMIC_INLINE) return __sts_dynamic_static_string(value, length);
+	char* copy = (char*)malloc(length + 1);
+	if(copy == NULL) return __sts_dynamic_static_string("", 0);
+	memcpy(copy, value, length + 1);
+	__sts_dynamic d;
+	d.type = __STS_String;
+	d.storage = __STS_STORED_OWNED;
+	d.as.pointer = copy;
+	return d;
+}
+
+static inline const char* __sts_dynamic_get_string(const __sts_dynamic* d)
+{
+	return d->storage == __STS_STORED_INLINE ? d->as.string : d->as.pointer;
+}
+
+static inline void __sts_dynamic_free(__sts_dynamic* d)
+{
+	if(d->storage == __STS_STORED_OWNED) free((char*)d->as.pointer);
+	d->storage = __STS_STORED_INLINE;
+}
+
+static inline void __sts_dynamic_set(__sts_dynamic* d, __sts_dynamic value)
+{
+	__sts_dynamic_free(d);
+	*d = value;
+}
+
+static inline __sts_dynamic __sts_dynamic_copy(const __sts_dynamic* d)
+{
+	if(d->storage == __STS_STORED_OWNED) return __sts_dynamic_string(d->as.pointer, strlen(d->as.pointer));
+	return *d;
+}
+'''
+
+HASH_STRING_CODE = '''
+// Seeded FNV-1a hash of a string, Also giving its length. Used by the string switches.
+static inline uint32_t __sts_hash_string(const char* value, uint32_t seed, size_t* length)
+{
+	const unsigned char* i = (const unsigned char*)value;
+	uint32_t hash = 2166136261u ^ seed;
+	while(*i) hash = (hash ^ *i++) * 16777619u;
+	*length = (size_t)((const char*)i - value);
+	return hash;
+}
+'''
+
+# The runtime library. Snippet name to (Libraries it needs, Snippets it needs, C code).
+# Only the snippets used by the program are written to the output, See CGenerator.use_runtime.
+RUNTIME_SNIPPETS = {
+	"attributes": ((), (), ATTRIBUTES_CODE),
+	"raiseException": (("stdio.h", "stdlib.h"), ("attributes",), EXCEPTION_RAISING_CODE),
+	"dynamic": (("stdlib.h", "string.h"), (), DYNAMIC_CODE),
+	"hash_string": (("stdint.h", "string.h"), (), HASH_STRING_CODE)
+}
+
+def decode_c_string(literal):
+	""" Returns the bytes of a C string literal. None If it has a null character or an escape sequence not handled here. """
+	out = bytearray()
+	text = literal[1:-1]
+	i = 0
+	while i < len(text):
+		if text[i] == "\\":
+			code = C_ESCAPES.get(text[i + 1:i + 2])
+			if code is None:
+				return None
+			out.append(code)
+			i += 2
+		else:
+			out += text[i].encode()
+			i += 1
+	return bytes(out)
+
+def hash_string(data, seed):
+	""" Returns the hash of the bytes computed by __sts_hash_string in the output. """
+	result = 2166136261 ^ seed
+	for i in data:
+		result = ((result ^ i) * 16777619) & 0xFFFFFFFF
+	return result
+
+def find_hash_seed(keys):
+	""" Returns a seed giving each key a different hash, So a matching hash needs a single compare to confirm. """
+	seed = 0
+	while len({hash_string(i, seed) for i in keys}) != len(keys):
+		seed += 1
+	return seed
+
+def get_string_keys(node):
+	"""
+	Returns the variable an if statement compares with string literals (a == "x" or a == "y"), And the literals.
+	None If the condition is anything else.
+	"""
+	if any(i != "or" for i in node.connectives):
+		return None
+	name = None
+	keys = []
+	for condition in node.conditions:
+		if not condition.is_string or condition.operator != "==":
+			return None
+		left, right = condition.left, condition.right
+		if C_STRING_REGEX.fullmatch(left):
+			left, right = right, left
+		if not IDENTIFIER_REGEX.fullmatch(left) or not C_STRING_REGEX.fullmatch(right) or name not in (None, left):
+			return None
+		name = left
+		keys.append(right)
+	return name, keys
+
+def get_string_chain(node):
+	"""
+	Returns the variable, The cases (List of (string literals, body)) and the default body of an if/else chain
+	comparing a single variable with string literals. None If the chain is too short to be worth a hash dispatch.
+	"""
+	name = None
+	cases = []
+	default = [node]
+	while True:
+		found = get_string_keys(node)
+		if found is None or name not in (None, found[0]) or has_loop_control(node.body): # break would leave the switch
+			break
+		name = found[0]
+		cases.append((found[1], node.body))
+		default = node.else_body
+		if default is None or len(default) != 1 or not isinstance(default[0], ast.IfStatement):
+			break
+		node = default[0]
+	keys = [i for literals, _ in cases for i in literals]
+	if len(keys) < STRING_DISPATCH_MINIMUM or any(decode_c_string(i) is None for i in keys):
+		return None
+	if default is not None and has_loop_control(default):
+		return None
+	return name, cases, default
+
+def is_throwing(nodes):
+	""" Does the body always end by throwing or exiting. """
+	return len(nodes) != 0 and isinstance(nodes[-1], (ast.Throw, ast.Exit))
+
+class CGenerator:
+	"""
+	Walks the Abstract syntax tree made by the Lexer and writes C code into the FileHelper.
+	out_file_name can be None If the output is only read back with file_helper.get_data().
+	[PARAMETER] line_directives: Source file name to point #line directives at, So debuggers and profilers show the StoryScript lines. None to not insert them.
+	[PARAMETER] source_map: Record the source line of the C code, See FileHelper.get_source_map.
+	"""
+	def __init__(self, out_file_name, file_helper=None, stream_lines=None, string_growth=2.0, line_directives=None, source_map=False):
+		self.file_helper = file_helper
+		self.string_growth = string_growth # Growth factor of the heap strings with their capacity checked at runtime
+		self.string_pool = {} # C string literal to the name of its static copy in the header
+		self.libraries = [] # Libraries included in the output
+		self.runtime = [] # Names of the RUNTIME_SNIPPETS used, Each after the snippets it needs
+		self.loop_depth = 0 # Number of loops around the code being generated. Used to name the loop counters.
+		self.dispatch_count = 0 # Number of string dispatches generated. Used to name their variables.
+		self.generate_depth = 0 # Number of generate calls running, 1 for a top level statement
+		self.dynamic_scopes = [[]] # Names of the stack Dynamics declared in each body being generated, Freed at its end
+		self.generators = {
+			ast.RawCode: self.generate_raw_code,
+			ast.Block: self.generate_block,
+			ast.VariableDeclaration: self.generate_variable_declaration,
+			ast.Assignment: self.generate_assignment,
+			ast.IfStatement: self.generate_if_statement,
+			ast.LoopFor: self.generate_loopfor,
+			ast.SwitchStatement: self.generate_switch_statement,
+			ast.Print: self.generate_print,
+			ast.Throw: self.generate_throw,
+			ast.Delete: self.generate_delete,
+			ast.Exit: self.generate_exit
+		}
+
+		if file_helper is None:
+			self.file_helper = FileHelper(out_file_name, stream_lines)
+			self.file_helper.insert_footer("\treturn 0;")
+			self.file_helper.insert_footer("}")
+			self.file_helper.indent_level = 1
+		if line_directives is not None:
+			self.file_helper.line_file = '"' + line_directives.replace("\\", "\\\\").replace('"', '\\"') + '"'
+		if source_map:
+			self.file_helper.source_map = []
+		self.map_lines = line_directives is not None or source_map
+
+	def generate(self, node):
+		""" Write the C code of a node. """
+		if not self.map_lines:
+			self.generators[type(node)](node)
+			return
+		# The C code written after a nested statement, Like the closing brace of a block, Belongs to the outer statement.
+		# At the top level, The line is kept so the end of the main function belongs to the last statement.
+		file_helper = self.file_helper
+		outer_line = file_helper.source_line
+		file_helper.source_line = node.line
+		self.generate_depth += 1
+		self.generators[type(node)](node)
+		self.generate_depth -= 1
+		if self.generate_depth:
+			file_helper.source_line = outer_line
+
+	def generate_body(self, nodes):
+		""" Write the C code of the statements inside a block, One indentation level deeper. """
+		self.file_helper.indent_level += 1
+		self.dynamic_scopes.append([])
+		for i in nodes:
+			self.generate(i)
+		self.free_dynamics()
+		self.file_helper.indent_level -= 1
+
+	def free_dynamics(self):
+		""" Free the strings owned by the stack Dynamics of the innermost body. """
+		for name in reversed(self.dynamic_scopes.pop()):
+			self.file_helper.insert_content(f"__sts_dynamic_free(&{name});")
+
+	def generate_end(self):
+		""" Write the end of the main function. Call once after the last node. """
+		self.free_dynamics()
+
+	def include_library(self, name):
+		""" Add the library to the included libraries If it's not included yet. """
+		if name not in self.libraries:
+			self.libraries.append(name)
+
+	def use_runtime(self, name):
+		""" Add a snippet of the runtime library to the output, With the libraries and snippets it needs. """
+		if name in self.runtime:
+			return
+		libraries, snippets, _ = RUNTIME_SNIPPETS[name]
+		for i in libraries:
+			self.include_library(i)
+		for i in snippets:
+			self.use_runtime(i)
+		self.runtime.append(name)
+
+	def write_header(self):
+		""" Insert the included libraries, The string pool, The runtime snippets used and the start of the main function. """
+		for i in self.libraries:
+			self.file_helper.insert_header(f"#include <{i}>")
+		for literal, name in self.string_pool.items():
+			self.file_helper.insert_header(f"static const char {name}[] = {literal};")
+		for i in self.runtime:
+			self.file_helper.insert_header(RUNTIME_SNIPPETS[i][2])
+		self.file_helper.insert_header("int main() {")
+
+	def pool_string(self, literal):
+		""" Returns the name of the static copy of a C string literal. The same literal always gets the same copy. """
+		name = self.string_pool.get(literal)
+		if name is None:
+			name = f"__sts_string_{len(self.string_pool)}"
+			self.string_pool[literal] = name
+		return name
+
+	def pool_strings(self, code):
+		"""
+		Returns the C code with its string literals replaced by their static copies.
+		Adjacent literals ("a" "b") are left as they are, Since C only joins literals and not arrays.
+		"""
+		if code is None or '"' not in code:
+			return code
+		def replace(match):
+			literal = match.group()
+			return self.pool_string(literal) if C_STRING_REGEX.fullmatch(literal) else literal
+		return C_STRING_RUN_REGEX.sub(replace, code)
+
+	def get_string_comparison(self, condition):
+		""" Returns the C expression of a string comparison. Comparisons with a literal use its length known at compile time. """
+		self.include_library("string.h")
+		left, right = condition.left, condition.right
+		if C_STRING_REGEX.fullmatch(left):
+			left, right = right, left
+		if condition.operator not in ("==", "!=") or not C_STRING_REGEX.fullmatch(right):
+			return f"strcmp({self.pool_strings(left)}, {self.pool_strings(right)}) {condition.operator} 0"
+		left = self.pool_strings(left)
+		name = self.pool_string(right)
+		code = f"(strlen({left}) == sizeof({name}) - 1 && memcmp({left}, {name}, sizeof({name}) - 1) == 0)"
+		return code if condition.operator == "==" else "!" + code
+
+	def generate_raw_code(self, node):
+		if node.code and not node.code.startswith("//"):
+			for i in DEFAULT_LIBRARIES:
+				self.include_library(i)
+		self.file_helper.insert_content(node.code)
+
+	def generate_block(self, node):
+		if not node.scoped:
+			for i in node.body:
+				self.generate(i)
+			return
+		self.file_helper.insert_content("{")
+		self.generate_body(node.body)
+		self.file_helper.insert_content("}")
+
+	def generate_variable_declaration(self, node):
+		insert = self.file_helper.insert_content
+		name = node.name
+		if node.is_heap:
+			self.include_library("stdlib.h")
+			if node.vartype == Types.String:
+				self.include_library("string.h")
+				insert(f"char *{name} = (char*)malloc({node.size});")
+				if node.check_capacity:
+					insert(f"size_t __sts_capacity_{name} = {node.size};")
+				if node.value is not None:
+					insert(f"if({name} != NULL) memcpy({name}, {self.pool_strings(node.value)}, {node.size});")
+			elif node.vartype == Types.Dynamic:
+				insert(f"__sts_dynamic *{name} = (__sts_dynamic*)malloc(sizeof(__sts_dynamic));")
+				insert(f"*{name} = {self.get_dynamic_code(node)};")
+			else:
+				insert(f"{node.ctype} *{name} = ({node.ctype}*)malloc(sizeof({node.ctype}));")
+				if node.value is not None:
+					insert(f"*{name} = {node.value};")
+		elif node.vartype == Types.Dynamic:
+			insert(f"__sts_dynamic {name} = {self.get_dynamic_code(node)};")
+			self.dynamic_scopes[-1].append(name)
+		elif node.value is None:
+			if node.vartype == Types.String and node.size is not None:
+				insert(f"char {name}[{node.size}];")
+			else:
+				insert(f"{node.ctype} {name};")
+		elif node.vartype == Types.String:
+			insert(f"char {name}[{node.size}] = {node.value};")
+		else:
+			insert(f"{node.ctype} {name} = {node.value};")
+
+	def generate_assignment(self, node):
+		insert = self.file_helper.insert_content
+		name = node.name
+		if node.vartype == Types.String:
+			self.include_library("string.h")
+			if node.check_capacity:
+				self.generate_capacity_check(name, node.size)
+			elif node.reallocate:
+				self.include_library("stdlib.h")
+				insert(f"{name} = realloc({name}, {node.capacity});")
+			insert(f"memcpy({name}, {self.pool_strings(node.value)}, {node.size});")
+		elif node.vartype == Types.Dynamic:
+			insert(f"__sts_dynamic_set({name if node.is_heap else '&' + name}, {self.get_dynamic_code(node)});")
+		else:
+			operator = "=" if node.operator == "=" else node.operator + "="
+			if node.is_heap:
+				name = "*" + name
+			insert(f"{name} {operator} {node.value};")
+
+	def get_dynamic_code(self, node):
+		""" Returns the C code making the Dynamic value of a declaration or an assignment, With the tag of its type. """
+		self.use_runtime("dynamic")
+		value = node.value
+		if value is None:
+			return "__sts_dynamic_int(0)"
+		if node.valtype == Types.Integer:
+			return f"__sts_dynamic_int({value})"
+		if node.valtype == Types.Float:
+			return f"__sts_dynamic_float({value})"
+		if node.valtype == Types.Boolean:
+			return f"__sts_dynamic_bool({BOOLEAN_VALUES.get(value, value)})"
+		if node.valtype == Types.Dynamic:
+			return f"__sts_dynamic_copy({value})"
+		if C_STRING_REGEX.fullmatch(value):
+			name = self.pool_string(value)
+			return f"__sts_dynamic_static_string({name}, sizeof({name}) - 1)"
+		return f"__sts_dynamic_string({value}, strlen({value}))"
+
+	def generate_capacity_check(self, name, length):
+		""" Grow or shrink a heap string at runtime, Like Lexer.get_string_capacity does at transpile time. """
+		insert = self.file_helper.insert_content
+		self.include_library("stdlib.h")
+		capacity = f"__sts_capacity_{name}"
+		growth = self.string_growth
+		grown = f"{capacity} * {int(growth)}" if growth == int(growth) else f"(size_t)({capacity} * {growth})"
+		shrink_at = max(math.ceil(length * growth * growth), length + 1, STRING_SHRINK_MINIMUM + 1)
+		insert(f"if({capacity} < {length}) {name} = realloc({name}, {capacity} = {grown} < {length} ? {length} : {grown});")
+		insert(f"else if({capacity} >= {shrink_at}) {name} = realloc({name}, {capacity} = {max(length, math.ceil(length * growth))});")
+
+	def get_condition_code(self, node):
+		""" Returns the C expression of the conditions of an IfStatement. """
+		code = []
+		for i, condition in enumerate(node.conditions):
+			if i:
+				code.append(" && " if node.connectives[i - 1] == "and" else " || ")
+			if condition.is_string:
+				code.append(self.get_string_comparison(condition))
+			elif condition.operator is None:
+				code.append(condition.left)
+			else:
+				code.append(f"{condition.left} {condition.operator} {condition.right}")
+		return "".join(code)
+
+	def generate_if_statement(self, node):
+		insert = self.file_helper.insert_content
+		chain = get_string_chain(node)
+		if chain is not None:
+			self.generate_string_dispatch(*chain)
+			return
+		condition = self.get_condition_code(node)
+		# a branch that only throws is cold.
+		if is_throwing(node.body):
+			self.use_runtime("attributes")
+			condition = f"__STS_UNLIKELY({condition})"
+		elif node.else_body is not None and is_throwing(node.else_body):
+			self.use_runtime("attributes")
+			condition = f"__STS_LIKELY({condition})"
+		insert(f"if ({condition})")
+		insert("{")
+		self.generate_body(node.body)
+		if node.else_body is not None:
+			insert("} else {")
+			self.generate_body(node.else_body)
+		insert("}")
+
+	def generate_loopfor(self, node):
+		# Nested loops get different counters, And a counter is only visible inside its own loop.
+		genvarname = f"__sts_loopcount_{self.loop_depth}"
+		self.file_helper.insert_content(f"for (int {genvarname} = 0; {genvarname} < {node.count}; {genvarname}++)" + " {")
+		self.loop_depth += 1
+		self.generate_body(node.body)
+		self.loop_depth -= 1
+		self.file_helper.insert_content("}")
+
+	def generate_string_dispatch(self, value, cases, default):
+		"""
+		Run the body of the first case with a string literal equal to the value, Or the default one.
+		The literals are hashed at transpile time with a seed that gives them all different hashes, So the value is hashed once
+		And compared with at most one literal. The index of the case found then picks the body in a second, Dense switch.
+		[PARAMETERS]
+		value = The C code of the string
+		cases = List of (string literals, body)
+		default = The body run when no literal is equal. None for nothing.
+		"""
+		insert = self.file_helper.insert_content
+		self.use_runtime("hash_string")
+		keys = {} # Bytes of the literal to (The literal, Index of its case). The first case with a literal wins, Like in an if/else chain.
+		for index, (literals, _) in enumerate(cases):
+			for literal in literals:
+				keys.setdefault(decode_c_string(literal), (literal, index))
+		seed = find_hash_seed(keys)
+		string = f"__sts_dispatch_string_{self.dispatch_count}"
+		length = f"__sts_dispatch_length_{self.dispatch_count}"
+		case = f"__sts_dispatch_case_{self.dispatch_count}"
+		self.dispatch_count += 1
+		insert("{")
+		self.file_helper.indent_level += 1
+		insert(f"const char* {string} = {value};")
+		insert(f"size_t {length};")
+		insert(f"int {case} = -1;")
+		insert(f"switch (__sts_hash_string({string}, {seed}u, &{length}))")
+		insert("{")
+		self.file_helper.indent_level += 1
+		for data, (literal, index) in keys.items():
+			name = self.pool_string(literal)
+			insert(f"case {hash_string(data, seed)}u: if ({length} == {len(data)} && memcmp({string}, {name}, {len(data)}) == 0) {case} = {index}; break;")
+		self.file_helper.indent_level -= 1
+		insert("}")
+		self.generate_switch_statement(ast.SwitchStatement(None, case, [(str(i), body) for i, (_, body) in enumerate(cases)], default))
+		self.file_helper.indent_level -= 1
+		insert("}")
+
+	def generate_switch_statement(self, node):
+		insert = self.file_helper.insert_content
+		if node.cases and all(C_STRING_REGEX.fullmatch(key) for key, _ in node.cases):
+			# C can't switch on strings.
+			if all(decode_c_string(key) is not None for key, _ in node.cases):
+				self.generate_string_dispatch(node.value, [([key], body) for key, body in node.cases], node.default)
+				return
+			chain = node.default
+			for key, body in reversed(node.cases):
+				chain = [ast.IfStatement(node.line, [ast.Comparison(node.line, node.value, "==", key, True)], [], body, chain)]
+			self.generate(chain[0])
+			return
+		insert(f"switch ({node.value})")
+		insert("{")
+		self.file_helper.indent_level += 1
+		for key, body in node.cases:
+			self.generate_case(f"case {key}:", body)
+		if node.default is not None:
+			self.generate_case("default:", node.default)
+		self.file_helper.indent_level -= 1
+		insert("}")
+
+	def generate_case(self, label, body):
+		""" Write a case of a switch. The body is braced, As a label can't be followed by a declaration in C. """
+		insert = self.file_helper.insert_content
+		insert(f"{label} {{")
+		self.generate_body(body)
+		insert("} break;")
+
+	def generate_print(self, node):
+		self.include_library("stdio.h")
+		value = node.value
+		match = C_STRING_RUN_REGEX.match(value)
+		if match is None:
+			self.file_helper.insert_content(f"printf({value});")
+		elif match.end() == len(value) and "%" not in value and C_STRING_REGEX.fullmatch(value):
+			# Nothing to format, Write the string with its length known at compile time.
+			name = self.pool_string(value)
+			self.file_helper.insert_content(f"fwrite({name}, 1, sizeof({name}) - 1, stdout);")
+		else:
+			# The format string stays a literal, So the C compiler can still check it against the arguments.
+			self.file_helper.insert_content(f"printf({match.group()}{self.pool_strings(value[match.end():])});")
+
+	def generate_throw(self, node):
+		self.use_runtime("raiseException")
+		description = self.pool_string('"' + node.description + '"')
+		self.file_helper.insert_content(f"raiseException({node.code}, {description});")
+
+	def generate_delete(self, node):
+		self.include_library("stdlib.h")
+		if node.vartype == Types.Dynamic:
+			self.file_helper.insert_content(f"__sts_dynamic_free({node.name});")
+		self.file_helper.insert_content(f"free({node.name});")
+
+	def generate_exit(self, node):
+		self.include_library("stdlib.h")
+		self.file_helper.insert_content(f"exit({node.code});")
@@ -0,0 +1,59 @@
+import argparse
+import socket
+import json
+import sys
+import os
+
+# Tiny client of the transpile daemon (python processor.py --daemon SOCKET). See daemon.py for the protocol.
+
+DEFAULT_SOCKET = os.environ.get("STORYSCRIPT_SOCKET", ".sts_daemon.sock")
+
+def send_request(socket_path, request):
+	""" Send a request to the daemon and wait for its response. """
+	with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+		client.connect(socket_path)
+		client.sendall(json.dumps(request).encode() + b"\n")
+		client.shutdown(socket.SHUT_WR)
+		data = b""
+		while not data.endswith(b"\n"):
+			chunk = client.recv(1 << 16)
+			if not chunk:
+				break
+			data += chunk
+	return json.loads(data)
+
+if __name__ == "__main__":
+	# python client.py -i main.sts -o main.c
+	# python client.py -i - < main.sts
+	parser = argparse.ArgumentParser(description="Transpile StoryScript code with a running transpile daemon.")
+	parser.add_argument("-s", "--socket", default=DEFAULT_SOCKET, help="The daemon socket path.")
+	parser.add_argument("-i", "--input", help="The input file. - to read the code from the standard input.")
+	parser.add_argument("-o", "--output", help="The target output file. The C code is printed If missing.")
+	parser.add_argument("-no-realloc", "--no-auto-reallocate", action="store_true", help="Tell the transpiler to not auto-reallocate memory.")
+	parser.add_argument("--minified", action="store_true", help="Tell the file writer to minify the output file or not.")
+	parser.add_argument("--ping", action="store_true", help="Check If the daemon is running.")
+	parser.add_argument("--stop", action="store_true", help="Shut the daemon down.")
+	args = parser.parse_args()
+
+	if args.ping or args.stop:
+		response = send_request(args.socket, {"command": "ping" if args.ping else "shutdown"})
+		raise SystemExit(0 if response["ok"] else 1)
+	if not args.input:
+		parser.error("the following arguments are required: -i/--input")
+	request = {"options": {}}
+	if args.no_auto_reallocate:
+		request["options"]["auto_reallocate"] = False
+	if args.minified:
+		request["options"]["minified"] = True
+	if args.input == "-":
+		request["source"] = sys.stdin.read()
+	else:
+		request["file"] = os.path.abspath(args.input)
+	if args.output:
+		request["output"] = os.path.abspath(args.output)
+	response = send_request(args.socket, request)
+	for i in response["diagnostics"]:
+		print(f"TRANSPILATION {i['severity'].upper()}: While processing line {i['line']}\n{i['message']}", file=sys.stderr)
+	if "output" in response:
+		sys.stdout.write(response["output"])
+	raise SystemExit(0 if response["ok"] else 1)
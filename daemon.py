@@ -0,0 +1,146 @@
+from transpiler import transpile, TranspileError
+from diagnostics import DiagnosticCollector
+from langEnums import Exceptions, Severity
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+import asyncio
+import json
+import stat
+import os
+
+# Requests and responses are JSON objects, One per line.
+#
+# Request:
+#   id = Any value, Copied to the response. Requests on the same connection can finish in any order.
+#   source = StoryScript code to transpile, Or
+#   file = Path of a StoryScript file to transpile.
+#   output = Path to write the C code to. If missing, The C code is returned in the response.
+#   options = Dict of transpile options (auto_reallocate, minified, constant_folding, unroll_threshold, heap_to_stack,
+#     string_growth, runtime_string_capacity, line_directives). line_directives is the file name for the #line directives.
+#   command = "ping" or "shutdown" instead of a transpile request.
+#
+# Response:
+#   id = The request id
+#   ok = Was the code transpiled without errors.
+#   output = The C code, If no output path was given.
+#   diagnostics = List of every error and warning: {"line": line number or None, "column": column from 1 or None,
+#     "severity": "error" or "warning", "code": Exceptions code, "name": Exceptions name, "message": text}
+#   elapsed = Seconds spent transpiling
+
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+
+def transpile_request(request, default_options):
+	""" Run a transpile request. Returns the response. """
+	response = {"id": request.get("id"), "ok": True, "diagnostics": []}
+	start_time = perf_counter()
+	diagnostics = DiagnosticCollector()
+	try:
+		options = dict(default_options, **request.get("options", {}))
+		if "source" in request:
+			source = request["source"]
+		else:
+			with open(request["file"], "r") as f:
+				source = f.read()
+		output = transpile(source, options, diagnostics)
+		if request.get("output"):
+			with open(request["output"], "w") as f:
+				f.write(output)
+		else:
+			response["output"] = output
+	except TranspileError as e:
+		response["ok"] = False
+		if not diagnostics.has_errors():
+			diagnostics.add_error(e)
+	except (Exception, SystemExit) as e:
+		response["ok"] = False
+		diagnostics.add_exception(e)
+	response["diagnostics"] = diagnostics.to_list()
+	response["elapsed"] = perf_counter() - start_time
+	return response
+
+class TranspileDaemon:
+	"""
+	Serves transpile requests over a Unix domain socket, Keeping the transpiler loaded between requests.
+	Requests are transpiled by a pool of threads, transpile() is safe to call from many threads.
+	[PARAMETERS]
+	socket_path = Path of the Unix domain socket.
+	options = Default transpile options of every request.
+	workers = Number of threads transpiling at the same time.
+	"""
+	def __init__(self, socket_path, options=None, workers=4):
+		self.socket_path = socket_path
+		self.options = options or {}
+		self.executor = ThreadPoolExecutor(max_workers=workers)
+		self.server = None
+		self.stopped = None
+
+	async def handle_request(self, line, writer, write_lock):
+		try:
+			request = json.loads(line)
+		except ValueError as e:
+			diagnostics = DiagnosticCollector()
+			diagnostics.add(Severity.Error, Exceptions.InvalidValue, f"InvalidValue: Invalid request: {e}")
+			response = {"id": None, "ok": False, "diagnostics": diagnostics.to_list()}
+		else:
+			command = request.get("command")
+			if command == "ping":
+				response = {"id": request.get("id"), "ok": True}
+			elif command == "shutdown":
+				response = {"id": request.get("id"), "ok": True}
+				self.stopped.set()
+			else:
+				loop = asyncio.get_running_loop()
+				response = await loop.run_in_executor(self.executor, transpile_request, request, self.options)
+		async with write_lock:
+			writer.write(json.dumps(response).encode() + b"\n")
+			await writer.drain()
+
+	async def handle_connection(self, reader, writer):
+		write_lock = asyncio.Lock()
+		tasks = set()
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				if not line.strip():
+					continue
+				task = asyncio.create_task(self.handle_request(line, writer, write_lock))
+				tasks.add(task)
+				task.add_done_callback(tasks.discard)
+			if tasks:
+				await asyncio.gather(*tasks)
+		except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+			pass
+		except asyncio.CancelledError: # The daemon is shutting down.
+			pass
+		finally:
+			writer.close()
+
+	def remove_socket(self):
+		""" Remove the socket file left by a previous daemon. """
+		try:
+			if stat.S_ISSOCK(os.stat(self.socket_path).st_mode):
+				os.remove(self.socket_path)
+		except FileNotFoundError:
+			pass
+
+	async def serve(self):
+		""" Serve requests until a shutdown request. """
+		self.stopped = asyncio.Event()
+		self.remove_socket()
+		self.server = await asyncio.start_unix_server(self.handle_connection, self.socket_path, limit=MAX_REQUEST_SIZE)
+		try:
+			async with self.server:
+				await self.stopped.wait()
+		finally:
+			self.remove_socket()
+			self.executor.shutdown(wait=False)
+
+def run_daemon(socket_path, options=None, workers=4):
+	""" Run a TranspileDaemon until it's shut down or interrupted. """
+	daemon = TranspileDaemon(socket_path, options, workers)
+	try:
+		asyncio.run(daemon.serve())
+	except KeyboardInterrupt:
+		pass
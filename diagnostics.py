@@ -0,0 +1,120 @@
+from langEnums import Exceptions, Severity
+import json
+import sys
+
+class Diagnostic:
+	"""
+	[FIELDS]
+	severity = Severity
+	code = The Exceptions member of the problem
+	message = Text of the problem, Starting with the name of its code. (e.g. "InvalidSyntax: ...")
+	line = Line number. None If unknown.
+	column = Column number, Starting from 1. None If unknown.
+	"""
+	__slots__ = ("severity", "code", "message", "line", "column")
+
+	def __init__(self, severity, code, message, line=None, column=None):
+		self.severity = severity
+		self.code = code
+		self.message = message
+		self.line = line
+		self.column = column
+
+	def format(self, file_name=None):
+		""" Returns the diagnostic as a single line: "file:line:column: severity code: message" """
+		location = [str(i) for i in (file_name, self.line, self.column) if i is not None]
+		location = ":".join(location) + ": " if location else ""
+		return f"{location}{self.severity.name.lower()} {self.code.value}: {self.message}"
+
+	@classmethod
+	def from_dict(cls, data):
+		""" Returns the Diagnostic of a dict made by to_dict. """
+		return cls(Severity[data["severity"].capitalize()], Exceptions(data["code"]), data["message"], data["line"], data["column"])
+
+	def to_dict(self):
+		return {
+			"line": self.line,
+			"column": self.column,
+			"severity": self.severity.name.lower(),
+			"code": self.code.value,
+			"name": self.code.name,
+			"message": self.message
+		}
+
+class DiagnosticCollector:
+	"""
+	Records every error and warning of a transpile. With a collector, The transpiler goes on after an error,
+	Skipping the statement or the block it was in, So all the problems are reported at the end of a single run.
+	[PARAMETER] file_name: The input file name shown in front of each diagnostic. None to leave it out.
+	"""
+	def __init__(self, file_name=None):
+		self.file_name = file_name
+		self.diagnostics = [] # Diagnostics in the order they were found
+		self.error_count = 0
+		self.warning_count = 0
+
+	def add(self, severity, code, message, line=None, column=None):
+		""" Record a diagnostic. """
+		if line == "Unknown":
+			line = None
+		self.diagnostics.append(Diagnostic(severity, code, message, line, column))
+		if severity is Severity.Error:
+			self.error_count += 1
+		else:
+			self.warning_count += 1
+
+	def add_error(self, error, token=None):
+		"""
+		Record a TranspileError.
+		[PARAMETER] token: The first Token of the statement the error happened in, For its column If the error has none.
+		"""
+		column = error.column
+		if column is None and token is not None and token.line == error.line:
+			column = token.column
+		self.add(Severity.Error, error.code, error.text, error.line, None if column is None else column + 1)
+
+	def add_exception(self, exception, line=None):
+		""" Record an unexpected exception raised while transpiling a line. """
+		self.add(Severity.Error, Exceptions.GeneralException, f"GeneralException: {type(exception).__name__}: {exception}", line)
+
+	def has_errors(self):
+		return self.error_count != 0
+
+	def sorted(self):
+		""" Returns the diagnostics sorted by their position. Diagnostics without a line come first. """
+		return sorted(self.diagnostics, key=lambda i: (i.line or 0, i.column or 0))
+
+	def get_report(self):
+		""" Returns the text of all the diagnostics, One per line, Followed by the number of errors and warnings. """
+		out = [i.format(self.file_name) for i in self.sorted()]
+		out.append(f"{self.error_count} error(s), {self.warning_count} warning(s)")
+		return "\n".join(out)
+
+	def to_list(self):
+		return [i.to_dict() for i in self.sorted()]
+
+	@classmethod
+	def from_dict(cls, data):
+		""" Returns a collector with the diagnostics of a dict made by to_dict, e.g. From a worker process. """
+		collector = cls(data["file"])
+		for i in data["diagnostics"]:
+			diagnostic = Diagnostic.from_dict(i)
+			collector.add(diagnostic.severity, diagnostic.code, diagnostic.message, diagnostic.line, diagnostic.column)
+		return collector
+
+	def to_dict(self):
+		return {
+			"file": self.file_name,
+			"errors": self.error_count,
+			"warnings": self.warning_count,
+			"diagnostics": self.to_list()
+		}
+
+def write_diagnostics_json(path, data):
+	""" Write the diagnostics to a JSON file. - to write them to the standard output. """
+	if path == "-":
+		json.dump(data, sys.stdout, indent=4)
+		sys.stdout.write("\n")
+		return
+	with open(path, "w") as f:
+		json.dump(data, f, indent=4)
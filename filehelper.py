@@ -1,11 +1,26 @@
+from shutil import copyfileobj
+import os
+
 class FileHelper:
-	def __init__(self, filename):
+	def __init__(self, filename, flush_lines=None):
+		"""
+		[PARAMETER] filename: The output file name.
+		[PARAMETER] flush_lines: Stream the Body section to a temporary file every time this many lines are stored. None to keep the whole Body in memory.
+		"""
 		self.filename = filename
 		self.header = []
 		self.body = []
 		self.footer = []
 		self.indent_level = 0
 		self.minified = False
+		self.flush_lines = flush_lines
+		self.body_file = None # Temporary file holding the flushed Body section.
+		self.source_line = None # Source line of the Content inserted now. Lines are only tracked once it's set, See map_line.
+		self.line_file = None # C string literal of the source file named in the #line directives. None to not insert them.
+		self.source_map = None # List of (Body line from 0, Source line) where the source line changes. None to not record it.
+		self.body_lines = 0 # Number of lines in the Body section, Counted while tracking the lines
+		self.directive_line = None # Source line the compiler gives to the next Body line, After the last #line directive
+		self.at_line_start = True
 
 	def insert_header(self, content):
 		""" Insert the Content in the Header section of the file. """
@@ -14,18 +29,86 @@ class FileHelper:
 	def insert_content(self, content):
 		""" Insert the Content in the Body section of the file. """
 		if not self.minified:
-			self.body.append(("\t" * self.indent_level) + content + "\n")
-		else:
-			self.body.append(content)
+			content = ("\t" * self.indent_level) + content + "\n"
+		if self.source_line is not None:
+			self.map_line(content)
+		self.body.append(content)
+		if self.flush_lines is not None and len(self.body) >= self.flush_lines:
+			self.flush_body()
+
+	def map_line(self, content):
+		"""
+		Record the source line of the Content about to be inserted in the Body section.
+		a #line directive is inserted before it If the line the compiler would give it is not its source line,
+		So every line of C code of a statement points at the statement.
+		"""
+		line = self.source_line
+		if self.line_file is not None and line != self.directive_line:
+			directive = f"#line {line} {self.line_file}\n"
+			if not self.at_line_start: # Minified
+				directive = "\n" + directive
+			self.body.append(directive)
+			self.body_lines += directive.count("\n")
+			self.directive_line = line
+			self.at_line_start = True
+		source_map = self.source_map
+		if source_map is not None and (not source_map or (source_map[-1][1] != line and source_map[-1][0] != self.body_lines)):
+			source_map.append((self.body_lines, line))
+		newlines = content.count("\n")
+		self.body_lines += newlines
+		if self.directive_line is not None:
+			self.directive_line += newlines
+		if content:
+			self.at_line_start = content.endswith("\n")
+
+	def get_source_map(self):
+		"""
+		Returns the list of (Line of the file from 1, Source line) where the source line changes.
+		Each source line covers the lines of the file until the next one. The Header lines are not covered.
+		Call after the whole Header is inserted.
+		"""
+		header_lines = "".join(self.header).count("\n")
+		return [(header_lines + line + 1, source_line) for line, source_line in self.source_map]
 
 	def insert_footer(self, content):
 		""" Insert the Content in the Footer section of the file. """
 		self.footer.append(content + "\n")
 
+	def flush_body(self):
+		""" Move the Body stored in memory to the temporary Body file. """
+		if self.body_file is None:
+			self.body_file = open(self.filename + ".body.tmp", "w+")
+		self.body_file.writelines(self.body)
+		self.body = []
+
+	def get_data(self):
+		""" Returns all the Data stored as a single string. """
+		body = "".join(self.body)
+		if self.body_file is not None:
+			self.body_file.seek(0)
+			body = self.body_file.read() + body
+		return "".join(self.header) + body + "".join(self.footer)
+
+	def discard(self):
+		""" Drop all the Data stored without writing it, Removing the temporary Body file. """
+		self.header = []
+		self.body = []
+		self.footer = []
+		if self.body_file is not None:
+			self.body_file.close()
+			os.remove(self.body_file.name)
+			self.body_file = None
+
 	def write_data_to_file(self):
-		""" Write all the Data stored to File. """
+		""" Write all the Data stored to File. The Header is written before the streamed Body. """
 		f = open(self.filename, 'w')
 		f.writelines(self.header)
+		if self.body_file is not None:
+			self.body_file.seek(0)
+			copyfileobj(self.body_file, f)
+			self.body_file.close()
+			os.remove(self.body_file.name)
+			self.body_file = None
 		f.writelines(self.body)
 		f.writelines(self.footer)
-		f.close()
\ No newline at end of file
+		f.close()
@@ -24,4 +24,18 @@ class Types(Enum):
 class ConditionType(Enum):
 	And	= 0
 	Or	= 1
-	Single	= 2
\ No newline at end of file
+	Single	= 2
+
+class TokenType(Enum):
+	Keyword	= 0
+	Name	= 1
+	Number	= 2
+	String	= 3
+	Operator	= 4
+	Punctuation	= 5
+	Comment	= 6
+	Unknown	= 7
+
+class Severity(Enum):
+	Error	= 0
+	Warning	= 1
@@ -200,17 +200,21 @@ def parse_condition_expression(expr, analyse_command_method):
 	restype = parse_type_from_value(resr)
 	resr = convert_to_python_native_type(restype, resr)
 
-	if expr[operator_index] == "==": # If the operator was ==
+	return compare_values(resl, expr[operator_index], resr)
+
+def compare_values(resl, operator, resr):
+	""" Returns the result of comparing two values with a compare operator. Exceptions.InvalidSyntax If the operator is invalid. """
+	if operator == "==": # If the operator was ==
 		if resl == resr: return True
-	elif expr[operator_index] == ">": # If the operator was >
+	elif operator == ">": # If the operator was >
 		if resl > resr: return True
-	elif expr[operator_index] == "<": # If the operator was <
+	elif operator == "<": # If the operator was <
 		if resl < resr: return True
-	elif expr[operator_index] == "!=": # If the operator was !=
+	elif operator == "!=": # If the operator was !=
 		if resl != resr: return True
-	elif expr[operator_index] == ">=": # If the operator was >=
+	elif operator == ">=": # If the operator was >=
 		if resl >= resr: return True
-	elif expr[operator_index] == "<=": # If the operator was <=
+	elif operator == "<=": # If the operator was <=
 		if resl <= resr: return True
 	else: return Exceptions.InvalidSyntax
 
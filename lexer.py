@@ -1,21 +1,74 @@
-from filehelper import FileHelper
 import langParser as parser
-from langEnums import Types, ConditionType, Exceptions
-from string import ascii_letters
-from random import randint
+import astnodes as ast
+from langEnums import Types, Exceptions, TokenType, Severity
+from tokenizer import join_tokens, get_parenthesized
+import math
+
+STRING_SHRINK_MINIMUM = 64 # Heap strings with at most this capacity are never shrunk
+DYNAMIC_VALUE_TYPES = frozenset((Types.Integer, Types.Float, Types.Boolean, Types.String)) # Types a Dynamic can hold
+
+class Variable:
+	"""
+	[FIELDS]
+	vartype = Variable type (Types)
+	value = The last value set. None If declared without a value.
+	is_heap = Is the variable heap allocated or not.
+	size = String length, Including the null terminator. None for other types.
+	capacity = Bytes allocated for a String. Can be more than size. None for other types.
+	"""
+	__slots__ = ("vartype", "value", "is_heap", "size", "capacity")
+
+	def __init__(self, vartype, value=None, is_heap=False, size=None, capacity=None):
+		self.vartype = vartype
+		self.value = value
+		self.is_heap = is_heap
+		self.size = size
+		self.capacity = size if capacity is None else capacity
+
+	def __repr__(self):
+		return f"Variable({self.vartype}, {self.value!r}, is_heap={self.is_heap}, size={self.size}, capacity={self.capacity})"
 
 # This class is used to store variables and function
 class SymbolTable:
+	"""
+	Variables are looked up in a single dict, So lookups cost the same however deep the scopes are.
+	Each open scope remembers the names declared in it, And the variables they hide, To undo them when it's popped.
+	Variable records are replaced, Never changed in place, So a snapshot only needs to copy the dicts.
+	"""
 	def __init__(self):
-		self.variable_table = {"true":(Types.Boolean, 1), "false":(Types.Boolean, 0)}
+		self.variable_table = {"true": Variable(Types.Boolean, 1), "false": Variable(Types.Boolean, 0)}
+		self.scopes = [] # For each open scope, a list of (declared name, hidden Variable or None)
 		self.function_table = {}
 		self.enableFunctionFeature = False
 		self.ignoreInfo = False
 
+	def push_scope(self):
+		""" Open a block scope. Variables declared until pop_scope are removed by it. """
+		self.scopes.append([])
+
+	def pop_scope(self):
+		""" Close the innermost block scope, Removing its variables and bringing back the ones they hid. """
+		for name, hidden in reversed(self.scopes.pop()):
+			if hidden is None:
+				self.variable_table.pop(name, None)
+			else:
+				self.variable_table[name] = hidden
+
+	def snapshot(self):
+		""" Returns the current state. See restore. """
+		return dict(self.variable_table), [list(i) for i in self.scopes], dict(self.function_table), self.enableFunctionFeature
+
+	def restore(self, snapshot):
+		""" Go back to a state returned by snapshot. The snapshot can be restored again later. """
+		variable_table, scopes, function_table, self.enableFunctionFeature = snapshot
+		self.variable_table = dict(variable_table)
+		self.scopes = [list(i) for i in scopes]
+		self.function_table = dict(function_table)
+
 	def copyvalue(self):
 		return self.variable_table, self.function_table, self.enableFunctionFeature
 
-	def importdata(self, variable_table, functionTable, enable_function_feature):
+	def importdata(self, variable_table, function_table, enable_function_feature):
 		self.variable_table = variable_table
 		self.function_table = function_table
 		self.enableFunctionFeature = enable_function_feature
@@ -23,11 +76,15 @@ class SymbolTable:
 	def get_all_variable_name(self):
 		return self.variable_table.keys()
 
+	def has_variable(self, key):
+		return key in self.variable_table
+
 	def get_variable(self, key):
+		""" Returns the Variable record of the key. """
 		return self.variable_table[key]
 
 	def get_variable_type(self, key):
-		return self.variable_table[key][0]
+		return self.variable_table[key].vartype
 
 	def get_all_function_name(self):
 		return self.function_table.keys()
@@ -35,8 +92,21 @@ class SymbolTable:
 	def get_function(self, key):
 		return self.function_table[key]
 
-	def set_variable(self, key, value, vartype, is_heap_allocated=False, str_size=None):
-		self.variable_table[key] = (vartype, value, is_heap_allocated, str_size)
+	def set_variable(self, key, value, vartype, is_heap_allocated=False, str_size=None, str_capacity=None):
+		""" Declare the variable in the innermost scope, Or replace its record If it's already declared. """
+		if self.scopes and key not in self.variable_table:
+			self.scopes[-1].append((key, None))
+		self.variable_table[key] = Variable(vartype, value, is_heap_allocated, str_size, str_capacity)
+
+	def set_capacity(self, key, capacity):
+		"""
+		Change the capacity of a heap string. a change inside a block scope is undone by pop_scope, Since the block may not run:
+		After it, Only the record from before the block is sure to be true.
+		"""
+		variable = self.variable_table[key]
+		if self.scopes:
+			self.scopes[-1].append((key, variable))
+		self.variable_table[key] = Variable(variable.vartype, variable.value, variable.is_heap, variable.size, capacity)
 
 	def set_function(self, key, value, arguments):
 		self.function_table[key] = (arguments, value)
@@ -47,622 +117,575 @@ class SymbolTable:
 	def delete_function(self, key):
 		del self.function_table[key]
 
-global libraryIncluded
-libraryIncluded:list = ["stdio.h", "stdlib.h"]
+def get_exception_code(text):
+	""" Returns the Exceptions member named at the start of an error text ("InvalidSyntax: ..."). GeneralException If it names none. """
+	return Exceptions.__members__.get(text.split(":", 1)[0], Exceptions.GeneralException)
+
+class TranspileError(Exception):
+	"""
+	Raised by the Lexer when a command can't be transpiled and print_errors is off.
+	[FIELDS]
+	text = The error message, Starting with the name of its Exceptions code. (e.g. "InvalidSyntax: ...")
+	line = Line number of the error.
+	column = Column of the token the error is at, Starting from 0 like Token.column. None If unknown.
+	code = The Exceptions member named at the start of the text. GeneralException If it names none.
+	"""
+	def __init__(self, text, line="Unknown", column=None):
+		super().__init__(f"While processing line {line}: {text}")
+		self.text = text
+		self.line = line
+		self.column = column
+		self.code = get_exception_code(text)
+
+# Block opening keyword to the name of the Lexer method parsing the block. The block ends with its own "end".
+BLOCK_PARSERS = {"if": "parse_if", "loopfor": "parse_loopfor", "switch": "parse_switch"}
+
+SWITCH_CASE_TERMINATORS = ("break", "case", "default") # Keywords ending the body of a switch case
+
+def match_blocks(tc):
+	"""
+	Match the blocks of the tokens in one pass, With a stack of the blocks open.
+	[RETURNS] Dict of the index of each block opening keyword to the index of its "end", And dict of the index of each "if" to the index of its "else".
+	The blocks missing their "end" are left out.
+	"""
+	ends = {}
+	elses = {}
+	stack = []
+	for index, token in enumerate(tc):
+		value = token.value
+		if value in BLOCK_PARSERS:
+			stack.append(index)
+		elif value == "end":
+			if stack:
+				ends[stack.pop()] = index
+		elif value == "else" and stack and stack[-1] not in elses:
+			elses[stack[-1]] = index
+	return ends, elses
+
+def get_block_depth(tc):
+	""" Returns the number of blocks opened by the tokens, Minus the number of blocks closed. """
+	depth = 0
+	for token in tc:
+		if token.value in BLOCK_PARSERS:
+			depth += 1
+		elif token.value == "end":
+			depth -= 1
+	return depth
+
+# Error messages
+paren_needed = "InvalidSyntax: Parenthesis is needed after a function name"
+close_paren_needed = "InvalidSyntax: Parenthesis is needed after an Argument input"
 
 class Lexer:
-	def __init__(self, symbol_table, out_file_name, file_helper=None, auto_reallocate=True):
+	""" Parse the tokens of StoryScript commands into Abstract syntax tree nodes. See astnodes. """
+	def __init__(self, symbol_table, auto_reallocate=True, print_errors=True, string_growth=2.0, runtime_string_capacity=False, diagnostics=None):
+		"""
+		[PARAMETER] print_errors: Print the transpilation errors and exit. If off, a TranspileError is raised instead.
+		[PARAMETER] diagnostics: a DiagnosticCollector recording the warnings, And the errors of the statements inside blocks,
+			Which are skipped so parsing goes on with the next statement. None to stop at the first error and ignore the warnings.
+		[PARAMETER] string_growth: Heap strings that are too small grow to at least their capacity times this. 1 to reallocate to the exact length.
+		[PARAMETER] runtime_string_capacity: Check the capacity of heap strings in the output code, Instead of at transpile time.
+		"""
 		self.symbol_table = symbol_table
-		self.file_helper = file_helper
 		self.auto_reallocate = auto_reallocate
-
-		if file_helper is None:
-			self.file_helper = FileHelper(out_file_name)
-			self.file_helper.insert_footer("\treturn 0;")
-			self.file_helper.insert_footer("}")
-			self.file_helper.indent_level = 1
-
-	def throw_keyword(self, tc, multiple_commands_index, ln="Unknown"):
-		# from traceback import print_stack
+		self.string_growth = string_growth
+		self.runtime_string_capacity = runtime_string_capacity
+		self.print_errors = print_errors
+		self.diagnostics = diagnostics
+		self.keyword_counts = None # Keyword starting a statement to number of statements, Nested ones included. None to not count them.
+		self.keyword_handlers = {} # Keyword to handler. See register_keyword.
+		self.pending = [] # Tokens of the lines of a block not closed yet. See parse_line.
+		self.pending_depth = 0 # Number of blocks still open in the pending tokens
+		self.register_default_keywords()
+
+	def throw_keyword(self, tc, ln="Unknown", varcontext=None):
 		# Throw keyword. "throw [Exception] [Description]"
-		def getDescription():
-			msg = ""
-			for i in tc[2:multiple_commands_index + 1]:
-				if i.startswith('"'):
-					i = i[1:]
-				if i.endswith('"'):
-					i = i[:-1]
-				msg += i + " "
-			msg = msg[:-1]
-			return parser.parse_escape_character(msg)
-
-		exceptionCode = 1
-		description = "No Description provided"
-
-		if tc[1] == "InvalidSyntax":
-			exceptionCode = 100
-		elif tc[1] == "AlreadyDefined":
-			exceptionCode = 101
-		elif tc[1] == "NotImplementedException":
-			exceptionCode = 102
-		elif tc[1] == "NotDefinedException":
-			exceptionCode = 103
-		elif tc[1] == "GeneralException":
-			exceptionCode = 104
-		elif tc[1] == "DivideByZeroException":
-			exceptionCode = 105
-		elif tc[1] == "InvalidValue":
-			exceptionCode = 106
-		elif tc[1] == "InvalidTypeException":
-			exceptionCode = 107
-		else:
-			self.raise_transpile_error("InvalidValue: The Exception entered is not defined", ln)
-
+		command_end = self.find_command_end(tc)
 		try:
-			if(tc[2]):
-				description = getDescription()
-				return f"raiseException({exceptionCode}, \"{description}\");", ""
-		except IndexError:
-			return f"raiseException({exceptionCode}, \"{description}\");", ""
+			exceptionCode = Exceptions[tc[1].value].value
+		except KeyError:
+			self.raise_transpile_error("InvalidValue: The Exception entered is not defined", ln)
 
-	def raise_transpile_error(self, text, ln="Unknown"):
+		description = "No Description provided"
+		if command_end > 2:
+			description = " ".join(i.value[1:-1] if i.type == TokenType.String else i.value for i in tc[2:command_end])
+			description = parser.parse_escape_character(description)
+		return ast.Throw(ln, exceptionCode, description)
+
+	def raise_transpile_error(self, text, ln="Unknown", column=None):
+		if not self.print_errors:
+			raise TranspileError(text, ln, column)
 		print("TRANSPILATION ERROR:")
 		print(f"While processing line {ln}")
 		print(text)
 		raise SystemExit
 
-	def variable_setting(self, tc, multiple_commands_index, ln):
+	def warn(self, text, ln="Unknown", column=None):
+		""" Record a warning. The text starts with the name of its Exceptions code, Like the errors. """
+		if self.diagnostics is not None:
+			self.diagnostics.add(Severity.Warning, get_exception_code(text), text, ln, None if column is None else column + 1)
+
+	def get_string_capacity(self, capacity, length, can_shrink=True):
+		"""
+		Returns the capacity a heap string needs to hold length bytes.
+		It grows geometrically, And only shrinks once the length is small enough to fit even after growing twice,
+		So strings changing between a few lengths are not reallocated every time.
+		"""
+		if length > capacity:
+			return max(length, math.ceil(capacity * self.string_growth))
+		if can_shrink and capacity > STRING_SHRINK_MINIMUM and length * self.string_growth * self.string_growth <= capacity:
+			return max(length, math.ceil(length * self.string_growth))
+		return capacity
+
+	def parse_value(self, tc, ln, varcontext=None):
+		""" Returns the C code of a value. """
+		if tc and tc[0].value == "input":
+			return self.input_keyword(tc, ln, varcontext)
+		return join_tokens(tc)
+
+	def variable_setting(self, tc, command_end, ln):
 		# Error messages
 		invalid_value = "InvalidValue: Invalid value"
 		mismatch_type = "InvalidValue: Value doesn't match variable type."
 		all_variable_name = self.symbol_table.get_all_variable_name()
+		name = tc[0].value
 
-		if tc[1] == "=": # Set operator
-			res, error = self.analyseCommand(tc[2:multiple_commands_index + 1])
-			if error: return res, error
-			value = ""
-
-			for i in tc[2:multiple_commands_index + 1]:
-				value += i + " "
-			value = value[:-1]
-
-			valtype = parser.parse_type_from_value(res)
-			if valtype == Exceptions.InvalidSyntax:
-				return invalid_value, Exceptions.InvalidValue
-			vartype = self.symbol_table.get_variable_type(tc[0])
-			# Check if Value Type matches Variable type
-			if valtype != vartype:
-				return mismatch_type, Exceptions.InvalidValue
-			res = parser.parse_escape_character(res)
-			if res in all_variable_name:
-				res = (self.symbol_table.get_variable(res))[1]
-			oldvar = self.symbol_table.get_variable(tc[0])
-			if error: self.raise_transpile_error(error[0], ln)
-			if oldvar[2]:
-				if oldvar[0] == Types.String:
-					error = self.symbol_table.set_variable(tc[0], res, vartype, oldvar[2], len(res) - 1)
-					if self.auto_reallocate:
-						if oldvar[3] < (len(res) - 1):
-							self.file_helper.insert_content(f"{tc[0]} = realloc({tc[0]}, {len(res) - 1});")
-						else:
-							if oldvar[3] > len(res) - 1 and oldvar[3] > 64:
-								self.file_helper.insert_content(f"{tc[0]} = realloc({tc[0]}, {len(res) - 1});")
-					else:
-						print("INFO: To set a Message to a String, Input string must be less than the Size specified or equal the Original string size If declared with initial value.")
-						if len(res) - 1 > oldvar[3]:
-							self.raise_transpile_error("InvalidValue: The input string length is more than the Original Defined size. If you want a Dynamically allocated string, Please don't use \"--no-auto-reallocate\" option.", ln)
-					return f"memcpy({tc[0]}, {res}, {len(res) - 1});", ""
-				if oldvar[0] == Types.Dynamic:
-					res = res.removeprefix("new Dynamic (")
-					res = res[:-1]
-					return f"{tc[0]} = (void*){res};", ""
-				return f"*{tc[0]} = {res};", ""
-			if vartype == Types.String:
-				length = len(res) - 1
-				error = self.symbol_table.set_variable(tc[0], res, vartype, oldvar[2], length)
-				if length > oldvar[3]:
-					self.raise_transpile_error("InvalidValue: The input string length is more than the Original Defined size. If you want a Dynamically allocated string, Please use the Heap allocated string instead If you want to make the String dynamiccally allocated.", ln)
-				return f"memcpy({tc[0]}, {res}, {length});", ""
-			if oldvar[0] == Types.Dynamic:
-				res = res.removeprefix("new Dynamic (")
-				res = res[:-1]
-				return f"{tc[0]} = (void*){res};", ""
-			error = self.symbol_table.set_variable(tc[0], res, vartype, oldvar[2])
-			return f"{tc[0]} = {res};", ""
-		elif tc[1] == "+=": # Add & Set operator
-			operator = "+"
-		elif tc[1] == "-=": # Subtract & Set operator
-			operator = "-"
-		elif tc[1] == "*=": # Multiply & Set operator
-			operator = "*"
-		elif tc[1] == "/=": # Divide & Set operator
-			operator = "/"
-		elif tc[1] == "%=": # Modulo Operaion & Set operator
-			operator = "%"
+		if tc[1].value == "=": # Set operator
+			operator = "="
+		elif tc[1].value in {"+=", "-=", "*=", "/=", "%="}: # Arithmetic & Set operators
+			operator = tc[1].value[0]
 		else:
-			res = ""
-			for i in tc:
-				res += i + " "
-			res = res[:-1]
-			return res, ""
-		res, error = self.analyseCommand(tc[2:multiple_commands_index + 1])
-		if error: return res, error
-		value = ""
-
-		for i in tc[2:multiple_commands_index + 1]:
-			value += i + " "
-		value = value[:-1]
+			return ast.RawCode(ln, join_tokens(tc))
+		res = self.parse_value(tc[2:command_end], ln)
 
 		valtype = parser.parse_type_from_value(res)
 		if valtype == Exceptions.InvalidSyntax:
-			return invalid_value, Exceptions.InvalidValue
-		vartype = self.symbol_table.get_variable_type(tc[0])
+			self.raise_transpile_error(invalid_value, ln)
+		vartype = self.symbol_table.get_variable_type(name)
 		# Check if Value Type matches Variable type
 		if valtype != vartype:
-			return mismatch_type, Exceptions.InvalidValue
+			self.raise_transpile_error(mismatch_type, ln)
 		res = parser.parse_escape_character(res)
 		if res in all_variable_name:
-			res = (self.symbol_table.get_variable(res))[1]
-		oldvar = self.symbol_table.get_variable(tc[0])
-		error = self.symbol_table.set_variable(tc[0], res, vartype, oldvar[2])
-		if error: self.raise_transpile_error(error[0], ln)
-		if oldvar[2]:
-			if oldvar[0] == Types.String:
-				self.raise_transpile_error(f"InvalidTypeException: You cannot use {operator}= with String.", ln)
-			if oldvar[0] == Types.Dynamic:
-				self.raise_transpile_error(f"InvalidTypeException: You cannot use {operator}= with Dynamics.", ln)
-			return f"*{tc[0]} {operator}= {res};", ""
-		return f"{tc[0]} {operator}= {res};", ""
-
-	def switch_case_statement(self, tc, ln):
-		cases = []
-		case = []
-		command = []
-		isInCaseBlock = False
-		isInDefaultBlock = False
-		isAfterCaseKeyword = False
-		currentCaseKey = None
-		for i in tc[2:]:
-			if i == "case":
-				isAfterCaseKeyword = True
-				continue
-			if isAfterCaseKeyword:
-				outkey = i
-				if outkey.endswith(":"):
-					outkey = outkey[:-1]
-				currentCaseKey = outkey
-				isAfterCaseKeyword = False
-				isInCaseBlock = True
-				continue
-			if isInCaseBlock:
-				if i == "&&":
-					case.append(command)
-					command = []
-					continue
-				if i == "break":
-					case.append(command)
-					cases.append((currentCaseKey, case))
-					command = []
-					case = []
-					isInCaseBlock = False
-					continue
-				command.append(i)
-			if i == "end":
+			res = self.symbol_table.get_variable(res).value
+		oldvar = self.symbol_table.get_variable(name)
+		if operator != "=":
+			self.symbol_table.set_variable(name, res, vartype, oldvar.is_heap)
+			if oldvar.is_heap:
+				if oldvar.vartype == Types.String:
+					self.raise_transpile_error(f"InvalidTypeException: You cannot use {operator}= with String.", ln)
+				if oldvar.vartype == Types.Dynamic:
+					self.raise_transpile_error(f"InvalidTypeException: You cannot use {operator}= with Dynamics.", ln)
+			return ast.Assignment(ln, name, operator, res, vartype, oldvar.is_heap)
+
+		if vartype == Types.String:
+			length = len(res) - 1
+			capacity = oldvar.capacity
+			check_capacity = False
+			if oldvar.is_heap:
+				if not self.auto_reallocate:
+					print("INFO: To set a Message to a String, Input string must be less than the Size specified or equal the Original string size If declared with initial value.")
+					if length > capacity:
+						self.raise_transpile_error("InvalidValue: The input string length is more than the Original Defined size. If you want a Dynamically allocated string, Please don't use \"--no-auto-reallocate\" option.", ln)
+				elif self.runtime_string_capacity:
+					check_capacity = True
+				else:
+					# Strings are not shrunk inside a block, The capacity from before the block is all that's known after it.
+					capacity = self.get_string_capacity(capacity, length, can_shrink=not self.symbol_table.scopes)
+			elif length > capacity:
+				self.raise_transpile_error("InvalidValue: The input string length is more than the Original Defined size. If you want a Dynamically allocated string, Please use the Heap allocated string instead If you want to make the String dynamiccally allocated.", ln)
+			reallocate = capacity != oldvar.capacity
+			if reallocate:
+				self.symbol_table.set_capacity(name, capacity)
+			self.symbol_table.set_variable(name, res, vartype, oldvar.is_heap, length, self.symbol_table.get_variable(name).capacity)
+			return ast.Assignment(ln, name, operator, res, vartype, oldvar.is_heap, length, reallocate, capacity, check_capacity)
+		if vartype == Types.Dynamic:
+			value, valtype = self.get_dynamic_value(tc[2:command_end], ln)
+			return ast.Assignment(ln, name, operator, value, vartype, oldvar.is_heap, valtype=valtype)
+		if not oldvar.is_heap:
+			self.symbol_table.set_variable(name, res, vartype, oldvar.is_heap)
+		return ast.Assignment(ln, name, operator, res, vartype, oldvar.is_heap)
+
+	def parse_line(self, tc, ln):
+		"""
+		Parse the tokens of a line. Returns an Abstract syntax tree node.
+		Blocks can span many lines: The tokens of a line leaving a block open are kept until the line closing it,
+		And None is returned for them until then.
+		"""
+		depth = self.pending_depth + get_block_depth(tc)
+		if not self.pending and depth <= 0:
+			return self.analyseCommand(tc, ln)
+		self.pending.extend(tc)
+		if depth > 0:
+			self.pending_depth = depth
+			return None
+		tc = self.pending
+		self.pending = []
+		self.pending_depth = 0
+		return self.analyseCommand(tc, tc[0].line)
+
+	def end_of_file(self):
+		""" Raise an error If a block is still open after the last line. """
+		if self.pending:
+			token = self.pending[0]
+			self.pending = []
+			self.pending_depth = 0
+			self.raise_transpile_error(f"InvalidSyntax: \"end\" is needed to close the \"{token.value}\" block", token.line, token.column)
+
+	def parse_statements(self, tc, start, stop, blocks, terminators=()):
+		"""
+		Parse the statements of tc[start:stop] until one of the terminators keywords, Outside of the nested blocks.
+		Statements are separated by "&&" or by a new line. Nested blocks are jumped over with the matches from match_blocks,
+		So every token is only read once however deep the blocks are.
+		When collecting the diagnostics, a statement or nested block with an error is recorded and skipped.
+		[RETURNS] The list of nodes, And the index of the terminator (stop If there's none).
+		"""
+		nodes = []
+		ends = blocks[0]
+		index = start
+		while index < stop:
+			token = tc[index]
+			value = token.value
+			if value in terminators:
 				break
-
-		defaultCase = False
-		
-		self.file_helper.insert_content(f"switch ({tc[1]})")
-		self.file_helper.insert_content("{")
-		self.file_helper.indent_level += 1
-		for i in cases:
-			if i[0] == "default":
-				defaultCase = i
+			if value == "&&":
+				index += 1
 				continue
-			self.file_helper.insert_content(f"case {i[0]}:")
-			self.file_helper.indent_level += 1
-			for j in i[1]:
-				self.file_helper.insert_content(self.analyseCommand(j)[0])
-			self.file_helper.insert_content("break;")
-			self.file_helper.indent_level -= 1
-		if defaultCase:
-			self.file_helper.insert_content("default:")
-			self.file_helper.indent_level += 1
-			for j in i[1]:
-				self.file_helper.insert_content(self.analyseCommand(j)[0])
-			self.file_helper.insert_content("break;")
-			self.file_helper.indent_level -= 1
-		self.file_helper.indent_level -= 1
-		self.file_helper.insert_content("}")
-
-		return "", ""
-
-	def if_else_statement(self, tc: list, ln: int):
-		allvar = self.symbol_table.get_all_variable_name()
-		def check_string_comparison(condition):
-			operator_index = 0
-			compare_operator = {">", "<", "==", "!=", ">=", "<="}
-			for i in condition:
-				if i in compare_operator:
-					break
-				operator_index += 1
-
-			resl = bool(parser.parse_type_from_value(" ".join(condition[:operator_index])) == Types.String)
-			if "".join(condition[:operator_index]) in allvar:
-				resl = resl or (self.symbol_table.get_variable_type("".join(condition[:operator_index])) == Types.String)
-			
-			resr = bool(parser.parse_type_from_value(" ".join(condition[operator_index + 1:])) == Types.String)
-			if "".join(condition[operator_index + 1:]) in allvar:
-				resr = resr or (self.symbol_table.get_variable_type("".join(condition[operator_index + 1:])) == Types.String)
-
-			if resl and resr:
-				joinedstrleft = " ".join(condition[:operator_index])
-				joinedstrright = " ".join(condition[operator_index + 1:])
-				return f"strcmp({joinedstrleft}, {joinedstrright}) == 0"
-			
-			return False
-
-		conditionslist:list = parser.parse_conditions(tc[1:])
-		finalString = "if ("
-		for i in conditionslist:
-			exprs = []
-			currentConditionType = ConditionType.Single
-			for j in i:
-				if j and isinstance(j, list):
-					strcmp = check_string_comparison(j)
-					if strcmp:
-						exprs.append(strcmp)
-					else: exprs.append(j)
-				elif isinstance(j, ConditionType):
-					currentConditionType = j
-			if currentConditionType == ConditionType.And:
-				for i in exprs:
-					finalString += parser.parse_string_list(i) + " && "
-				finalString = finalString[:-4]
-			elif currentConditionType == ConditionType.Single:
-				finalString += parser.parse_string_list(exprs[0])
-			elif currentConditionType == ConditionType.Or:
-				for i in exprs:
-					finalString += parser.parse_string_list(i) + "||"
-				finalString = finalString[:-4]
-		finalString += ")"
-
-		isInCodeBlock: bool = False
-		isInElseBlock: bool = False
-		have_passed_then_keyword: bool = False
-		ifstatement: dict = {"if":[], "else":None}
-		commands: list = []
-		command: list = []
-		endkeywordcount: int = 0 # All "end" keyword in the expression
-		endkeywordpassed: int = 0 # All "end" keyword passed
-		elsekeywordcount: int = 0 # All "else" keyword in the expression
-		elsekeywordpassed: int = 0 # All "else" keyword passed
-		for i in tc[2:]:
-			if i == "end":
-				endkeywordcount += 1
-			elif i == "else":
-				elsekeywordcount += 1
-		for i in tc:
-			if not have_passed_then_keyword and i == "then":
-				isInCodeBlock = True
-				have_passed_then_keyword = True
+			if value in BLOCK_PARSERS:
+				end = ends.get(index)
+				if end is None or end >= stop:
+					self.raise_transpile_error(f"InvalidSyntax: \"end\" is needed to close the \"{value}\" block", token.line, token.column)
+				if self.keyword_counts is not None:
+					self.count_keyword(value)
+				try:
+					nodes.append(getattr(self, BLOCK_PARSERS[value])(tc, index, blocks, token.line))
+				except TranspileError as e:
+					if self.diagnostics is None:
+						raise
+					self.diagnostics.add_error(e, token)
+				index = end + 1
 				continue
-			if isInCodeBlock:
-				if i == "&&":
-					commands.append(command)
-					command = []
-					continue
-				elif i == "end":
-					endkeywordpassed += 1
-					if endkeywordcount == endkeywordpassed:
-						commands.append(command)
-						command = []
-						if isInElseBlock:
-							ifstatement["else"] = commands
-						else: ifstatement["if"] = commands
-						isInElseBlock = False
-						isInCodeBlock = False
-						continue
-				elif i == "else":
-					elsekeywordpassed += 1
-					if elsekeywordcount == elsekeywordpassed and endkeywordpassed + 1 == endkeywordcount:
-						commands.append(command)
-						command = []
-						ifstatement["if"] = commands
-						commands = []
-						isInElseBlock = True
-						continue
-				command.append(i)
-		self.file_helper.insert_content(finalString)
-		self.file_helper.insert_content("{")
-		self.file_helper.indent_level +=  1
-		for i in ifstatement["if"]:
-			self.file_helper.insert_content(self.analyseCommand(i)[0])
-		self.file_helper.indent_level -= 1
-		if ifstatement["else"] is not None:
-			self.file_helper.insert_content("} else {")
-			self.file_helper.indent_level +=  1
-			for i in ifstatement["else"]:
-				self.file_helper.insert_content(self.analyseCommand(i)[0])
-			self.file_helper.indent_level -= 1
-			self.file_helper.insert_content("}")
-		else: self.file_helper.insert_content("}")
-
-		return "", ""
+			end = index + 1
+			while end < stop and tc[end].line == token.line and tc[end].value != "&&" and tc[end].value not in terminators:
+				end += 1
+			try:
+				nodes.append(self.analyseCommand(tc[index:end], token.line))
+			except TranspileError as e:
+				if self.diagnostics is None:
+					raise
+				self.diagnostics.add_error(e, token)
+			index = end
+		return nodes, index
+
+	def parse_block(self, tc, start, stop, blocks, terminators=()):
+		"""
+		Parse the statements of a block body, See parse_statements.
+		The body has its own scope, Variables declared inside it are not visible after it.
+		"""
+		self.symbol_table.push_scope()
+		try:
+			return self.parse_statements(tc, start, stop, blocks, terminators)
+		finally:
+			self.symbol_table.pop_scope()
+
+	def block_statement(self, tc, ln, varcontext=None):
+		""" Parse the block starting at tc[0]. Handler of the block opening keywords (if, loopfor, switch). """
+		blocks = match_blocks(tc)
+		if 0 not in blocks[0]:
+			self.raise_transpile_error(f"InvalidSyntax: \"end\" is needed to close the \"{tc[0].value}\" block", ln, tc[0].column)
+		return getattr(self, BLOCK_PARSERS[tc[0].value])(tc, 0, blocks, ln)
+
+	def parse_switch(self, tc, start, blocks, ln):
+		""" Parse the block at tc[start]: "switch [value] case [key]: [body] break ... default: [body] break end" """
+		end = blocks[0][start]
+		# The tested value is everything before the first case.
+		index = start + 1
+		while index < end and tc[index].value not in {"case", "default"}:
+			index += 1
+		value = join_tokens(tc[start + 1:index])
+		cases = []
+		default = None
+		while index < end:
+			keyword = tc[index].value
+			if keyword == "&&":
+				index += 1
+				continue
+			if keyword == "case" and index + 1 < end:
+				key = tc[index + 1].value
+				index += 2
+			elif keyword == "default":
+				key = None
+				index += 1
+			else:
+				self.raise_transpile_error("InvalidSyntax: a switch can only have \"case [key]:\" and \"default:\" blocks", tc[index].line, tc[index].column)
+			case_token = tc[index - 1 if key is None else index - 2]
+			if index < end and tc[index].value == ":":
+				index += 1
+			body, index = self.parse_block(tc, index, end, blocks, SWITCH_CASE_TERMINATORS)
+			if index < end and tc[index].value == "break":
+				index += 1
+			else:
+				self.warn("InvalidSyntax: \"break\" is missing at the end of the case", case_token.line, case_token.column)
+			if key is None:
+				default = body
+			else:
+				cases.append((key, body))
+		return ast.SwitchStatement(ln, value, cases, default)
 
-	def analyseCommand(self, tc, ln="Unknown", varcontext=None):
-		# All Keywords
-		basekeywords = {"if", "else", "var", "int",
-						"bool", "float", "list", "dictionary",
-						"tuple", "dynamic", "const", "override",
-						"func", "end", "print", "input",
-						"throw", "string", "del", "namespace",
-						"#define", "loopfor", "switch",
-						"input", "exit"}
-
-		is_multiple_commands = False
-		multiple_commands_index = -1
+	def parse_condition(self, condition, ln):
+		""" Parse a single condition of an if statement into a Comparison. """
+		allvar = self.symbol_table.get_all_variable_name()
+		compare_operator = {">", "<", "==", "!=", ">=", "<="}
+		def is_string_operand(operand):
+			if len(operand) != 1:
+				return False
+			if operand[0].type == TokenType.String:
+				return True
+			return operand[0].value in allvar and self.symbol_table.get_variable_type(operand[0].value) == Types.String
+
+		operator_index = 0
+		for i in condition:
+			if i.value in compare_operator:
+				break
+			operator_index += 1
+		if operator_index == len(condition):
+			return ast.Comparison(ln, join_tokens(condition))
+		left = condition[:operator_index]
+		right = condition[operator_index + 1:]
+		is_string = is_string_operand(left) and is_string_operand(right)
+		return ast.Comparison(ln, join_tokens(left), condition[operator_index].value, join_tokens(right), is_string)
+
+	def parse_if(self, tc, start, blocks, ln):
+		""" Parse the block at tc[start]: "if [conditions] then [body] else [body] end", The else part being optional. """
+		ends, elses = blocks
+		end = ends[start]
+		# Conditions are joined by "and" / "or" until the "then" keyword.
+		conditions = []
+		connectives = []
+		condition = []
+		index = start + 1
+		while index < end and tc[index].value != "then":
+			value = tc[index].value
+			if value == "and" or value == "or":
+				conditions.append(self.parse_condition(condition, ln))
+				connectives.append(value)
+				condition = []
+			else:
+				condition.append(tc[index])
+			index += 1
+		if index == end:
+			self.raise_transpile_error("InvalidSyntax: \"then\" is needed after the conditions of an if statement", ln)
+		conditions.append(self.parse_condition(condition, ln))
+		else_index = elses.get(start)
+		body, _ = self.parse_block(tc, index + 1, end if else_index is None else else_index, blocks)
+		else_body = None
+		if else_index is not None:
+			else_body, _ = self.parse_block(tc, else_index + 1, end, blocks)
+		return ast.IfStatement(ln, conditions, connectives, body, else_body)
+
+	def get_dynamic_value(self, tc, ln):
+		"""
+		Returns the C code of the value inside "new Dynamic (value)", And its type (Types).
+		a heap variable is dereferenced, Except a Dynamic, Which is given as a pointer to copy from.
+		"""
+		args = get_parenthesized(tc[2:])
+		if args is None:
+			self.raise_transpile_error("InvalidSyntax: Parenthesis is needed around the Dynamic value", ln)
+		value = join_tokens(args)
+		if self.symbol_table.has_variable(value):
+			variable = self.symbol_table.get_variable(value)
+			if variable.vartype == Types.Dynamic:
+				return (value if variable.is_heap else "&" + value), Types.Dynamic
+			if variable.vartype not in DYNAMIC_VALUE_TYPES:
+				self.raise_transpile_error("InvalidTypeException: a Dynamic can only hold an integer, a float, a bool, a string or a Dynamic.", ln)
+			if variable.is_heap and variable.vartype != Types.String:
+				value = "*" + value
+			return value, variable.vartype
+		valtype = parser.parse_type_from_value(value)
+		if valtype not in DYNAMIC_VALUE_TYPES:
+			self.raise_transpile_error("InvalidTypeException: a Dynamic can only hold an integer, a float, a bool, a string or a Dynamic.", ln)
+		return value, valtype
+
+	def register_keyword(self, keyword, handler):
+		"""
+		Register the handler of a keyword. The handler is called with (tc, ln, varcontext)
+		when a command starts with the keyword, And returns an Abstract syntax tree node.
+		"""
+		self.keyword_handlers[keyword] = handler
+
+	def register_default_keywords(self):
+		""" Register the handlers of all the built-in keywords. """
+		for i in ("var", "int", "bool", "float", "list", "dictionary", "tuple", "const", "string", "dynamic"):
+			self.register_keyword(i, self.variable_declaration)
+		self.register_keyword("print", self.print_keyword)
+		self.register_keyword("input", self.input_statement)
+		for i in BLOCK_PARSERS:
+			self.register_keyword(i, self.block_statement)
+		self.register_keyword("exit", self.exit_keyword)
+		self.register_keyword("#define", self.define_keyword)
+		self.register_keyword("throw", self.throw_keyword)
+		self.register_keyword("del", self.del_keyword)
+		for i in ("else", "override", "func", "end", "namespace"):
+			self.register_keyword(i, self.not_implemented_keyword)
+
+	def find_command_end(self, tc):
+		""" Returns the index of the first "&&" in the tokens, Which ends the current command. """
+		command_end = 0
 		for i in tc:
-			multiple_commands_index += 1
-			if i == "&&":
-				is_multiple_commands = True
+			if i.value == "&&":
 				break
+			command_end += 1
+		return command_end
 
-		all_variable_name = self.symbol_table.get_all_variable_name()
-		all_function_name = self.symbol_table.get_all_function_name()
+	def variable_declaration(self, tc, ln, varcontext=None):
+		command_end = self.find_command_end(tc)
+		keyword = tc[0].value
+		try:
+			if tc[2].value == "=" or tc[3].value == "=": pass
+			else: raise IndexError
+			definedType = parser.parse_type_string(keyword)
+			if(tc[1].value in self.symbol_table.get_all_variable_name()):
+				self.raise_transpile_error(f"AlreadyDefined: a Variable \"{tc[1].value}\" is already defined", ln)
+
+			# Checking for variable naming violation
+			if not (parser.check_naming_violation(tc[1].value)):
+				self.raise_transpile_error("InvalidValue: a Variable name cannot start with digits.", ln)
+
+			# var(0) a(1) =(2) 3(3)
+			# double(0) heap(1) b(2) =(3) 5(4)
+			isHeap = False
+			if tc[1].value == "heap":
+				isHeap = True
+				name = tc[2].value
+				valuetokens = tc[4:command_end]
+			else:
+				name = tc[1].value
+				valuetokens = tc[3:command_end]
+			res = self.parse_value(valuetokens, ln, name)
+			vartype = parser.parse_type_from_value(res)
+			# Check If existing variable type matches the New value type
+			if keyword != "var" and definedType != vartype:
+				self.raise_transpile_error("InvalidValue: Variable types doesn't match value type.", ln)
+			if vartype == Exceptions.InvalidSyntax:
+				self.raise_transpile_error("InvalidSyntax: Invalid value", ln)
+			res = parser.parse_escape_character(res)
+			outvartype = keyword
+			if keyword == "var":
+				outvartype = parser.convert_types_enum_to_string(vartype)
 
-		# Error messages
-		paren_needed = "InvalidSyntax: Parenthesis is needed after a function name"
-		close_paren_needed = "InvalidSyntax: Parenthesis is needed after an Argument input"
+			if vartype == Types.String:
+				self.symbol_table.set_variable(name, res, vartype, isHeap, len(res) - 1)
+				return ast.VariableDeclaration(ln, name, vartype, outvartype, res, isHeap, len(res) - 1, isHeap and self.runtime_string_capacity)
+			if vartype == Types.Dynamic:
+				# dynamic[0] heap[1] a[2] =[3] new[4] Dynamic[5] (value)[6]
+				# dynamic[0] a[1] =[2] new[3] Dynamic[4] (value)[5]
+				varval, valtype = self.get_dynamic_value(valuetokens, ln)
+				self.symbol_table.set_variable(name, res, vartype, isHeap)
+				return ast.VariableDeclaration(ln, name, vartype, outvartype, varval, isHeap, valtype=valtype)
+			self.symbol_table.set_variable(name, res, vartype, isHeap)
+			return ast.VariableDeclaration(ln, name, vartype, outvartype, res, isHeap)
+		except IndexError:
+			# var(0) a(1)			(Stack allocation)
+			# int(0) heap(1) a(2)	(Heap allocation)
+			# string(0) heap(1) a(2) 20(3) (String heap allocation)
+			if keyword == "var":
+				self.raise_transpile_error("InvalidSyntax: Initial value needed for var keyword", ln)
+			vartype = parser.parse_type_string(keyword)
+			if vartype == Exceptions.InvalidSyntax:
+				self.raise_transpile_error("InvalidSyntax: Invalid type", ln)
+			if tc[1].value == "heap":
+				name = tc[2].value
+				if vartype == Types.String:
+					self.symbol_table.set_variable(name, None, vartype, True, int(tc[3].value))
+					return ast.VariableDeclaration(ln, name, vartype, keyword, None, True, int(tc[3].value), self.runtime_string_capacity)
+				self.symbol_table.set_variable(name, None, vartype, True)
+				return ast.VariableDeclaration(ln, name, vartype, keyword, None, True)
+			self.symbol_table.set_variable(tc[1].value, None, vartype, False)
+			return ast.VariableDeclaration(ln, tc[1].value, vartype, keyword)
+
+	def print_keyword(self, tc, ln, varcontext=None):
+		command_end = self.find_command_end(tc)
+		value = get_parenthesized(tc[1:command_end])
+		if value is None:
+			if tc[1].value != "(": # Check If the expression has parentheses around or not
+				self.raise_transpile_error(paren_needed, ln) # Return error if not exists
+			self.raise_transpile_error(close_paren_needed, ln) # Return error if not exists
+		return ast.Print(ln, join_tokens(value))
+
+	def input_keyword(self, tc, ln, varcontext=None):
+		command_end = self.find_command_end(tc)
+		value = get_parenthesized(tc[2:command_end]) # Get all parameters provided inside the parentheses
+		if value is None:
+			if tc[2].value != "(": # Check If the expression has parentheses around or not
+				self.raise_transpile_error(paren_needed, ln) # Return error if not exists
+			self.raise_transpile_error(close_paren_needed, ln) # Return error if not exists
+		return f"scanf(\"%s\", &{varcontext})" # Return the Recieved Input
+
+	def input_statement(self, tc, ln, varcontext=None):
+		return ast.RawCode(ln, self.input_keyword(tc, ln, varcontext) + ";")
+
+	def exit_keyword(self, tc, ln, varcontext=None):
+		command_end = self.find_command_end(tc)
+		value = get_parenthesized(tc[1:command_end]) # Get all parameters provided inside the parentheses
+		if value is None:
+			if tc[1].value != "(": # Check If the expression has parentheses around or not
+				self.raise_transpile_error(paren_needed, ln) # Return error if not exists
+			self.raise_transpile_error(close_paren_needed, ln) # Return error if not exists
+		if not value:
+			self.raise_transpile_error("InvalidValue: Parameter \"status\" (int) required.", ln)
+		value = join_tokens(value)
+		if parser.parse_type_from_value(value) != Types.Integer or parser.try_parse_int(value) == value:
+			self.raise_transpile_error("InvalidValue: Exit code can only be integer.", ln)
+		return ast.Exit(ln, int(value))
+
+	def define_keyword(self, tc, ln, varcontext=None):
+		try:
+			# Set Interpreter Settings
+			if tc[1].value == "interpet" and tc[2].value == "ignoreInfo":
+				self.symbol_table.ignoreInfo = bool(tc[3].value == "true")
+				return ast.RawCode(ln, "")
+		except IndexError:
+			pass
+		self.raise_transpile_error("InvalidValue: You needed to describe what you will change.", ln)
+
+	def del_keyword(self, tc, ln, varcontext=None):
+		if tc[1].value not in self.symbol_table.get_all_variable_name():
+			self.raise_transpile_error(f"NotDefinedException: The variable {tc[1].value} is not defined.", ln)
+		if not self.symbol_table.get_variable(tc[1].value).is_heap:
+			self.raise_transpile_error(f"InvalidValue: The variable {tc[1].value} is not heap allocated.", ln)
+		return ast.Delete(ln, tc[1].value, self.symbol_table.get_variable_type(tc[1].value))
+
+	def parse_loopfor(self, tc, start, blocks, ln):
+		""" Parse the block at tc[start]: "loopfor [count] [body] end" """
+		try:
+			count = int(tc[start + 1].value)
+		except ValueError:
+			self.raise_transpile_error("InvalidValue: Count must be an Integer. (Whole number)", ln, tc[start + 1].column)
+		if count <= 0:
+			self.warn("InvalidValue: The loop body never runs, Count is not more than 0.", ln, tc[start + 1].column)
+		body, _ = self.parse_block(tc, start + 2, blocks[0][start], blocks)
+		return ast.LoopFor(ln, count, body)
+
+	def not_implemented_keyword(self, tc, ln, varcontext=None):
+		self.raise_transpile_error("NotImplementedException: This feature is not implemented", ln)
+
+	def count_keyword(self, keyword):
+		self.keyword_counts[keyword] = self.keyword_counts.get(keyword, 0) + 1
 
+	def analyseCommand(self, tc, ln="Unknown", varcontext=None):
+		""" Parse the tokens of a command. Returns an Abstract syntax tree node. """
 		try:
-			if tc[0] in all_variable_name:
+			keyword = tc[0].value
+			if self.keyword_counts is not None and tc[0].type == TokenType.Keyword:
+				self.count_keyword(keyword)
+			if keyword in self.symbol_table.get_all_variable_name():
 				try:
-					return self.variable_setting(tc, multiple_commands_index, ln)
+					return self.variable_setting(tc, self.find_command_end(tc), ln)
 				except IndexError:
-					res = ""
-					for i in tc:
-						res += i + " "
-					res = res[:-1]
-					return res, ""
-			elif tc[0] in basekeywords:
-				if tc[0] in {"var", "int", "bool", "float", "list", "dictionary", "tuple", "const", "string", "dynamic"}:
-					try:
-						if tc[2] == "=" or tc[3] == "=": pass
-						else: raise IndexError
-						definedType = parser.parse_type_string(tc[0])
-						if(tc[1] in self.symbol_table.get_all_variable_name()):
-							self.raise_transpile_error(f"AlreadyDefined: a Variable \"{tc[1]}\" is already defined", ln)
-						
-						# Checking for variable naming violation
-						if not (parser.check_naming_violation(tc[1])):
-							self.raise_transpile_error("InvalidValue: a Variable name cannot start with digits.", ln)
-
-						# var(0) a(1) =(2) 3(3)
-						# double(0) heap(1) b(2) =(3) 5(4)
-						isHeap = False
-						if tc[1] == "heap":
-							isHeap = True
-							res, error = self.analyseCommand(tc[4:multiple_commands_index + 1], tc[2])
-							if isinstance(error, Exceptions):
-								self.raise_transpile_error(res, ln)
-						else:
-							res, error = self.analyseCommand(tc[3:multiple_commands_index + 1], tc[1])
-							if isinstance(error, Exceptions):
-								self.raise_transpile_error(res, ln)
-						value = ""
-
-						for i in tc[3:multiple_commands_index + 1]:
-							value += i + " "
-						value = value[:-1]
-						vartype = parser.parse_type_from_value(res)
-						# Check If existing variable type matches the New value type
-						if tc[0] != "var" and definedType != vartype:
-							self.raise_transpile_error("InvalidValue: Variable types doesn't match value type.", ln)
-						if vartype == Exceptions.InvalidSyntax:
-							self.raise_transpile_error("InvalidSyntax: Invalid value", ln)
-						res = parser.parse_escape_character(res)
-
-						if isHeap:
-							outvartype = tc[0]
-							if tc[0] == "var":
-								outvartype = parser.convert_types_enum_to_string(vartype)
-							if vartype == Types.String:
-								if "string.h" not in libraryIncluded:
-									libraryIncluded.append("string.h")
-								self.symbol_table.set_variable(tc[2], res, vartype, True, len(res) - 1)
-								self.file_helper.insert_content(f"char *{tc[2]} = (char*)malloc({len(res) - 1});")
-								return f"if({tc[2]} != NULL) memcpy({tc[2]}, {res}, {len(res) - 1});", ""
-							if vartype == Types.Dynamic:
-								# dynamic[0] heap[1] a[2] =[3] new[4] Dynamic[5] (memsize)[6]
-								self.symbol_table.set_variable(tc[2], res, vartype, True)
-								args = parser.parse_string_list(tc[6:])
-								args = args[1:-1]
-								varval = parser.parse_string_list(args)
-								intval = parser.try_parse_int(varval)
-								if isinstance(intval, int):
-									if intval <= 2147483647 and intval >= -2147483647:
-										if intval <= 9223372036854775807 and intval >= -9223372036854775807:
-											bytesize = 16
-										else: bytesize = 8
-									else: bytesize = 4
-								else:
-									bytesize = len(varval) - 1
-								try:
-									self.file_helper.insert_content(f"void* {tc[2]} = malloc({bytesize});")
-									return f"{tc[2]} = (void*){varval};", ""
-								except NameError:
-									return f"void* {tc[2]} = malloc({bytesize});"
-							self.symbol_table.set_variable(tc[2], res, vartype, True)
-							self.file_helper.insert_content(f"{outvartype} *{tc[2]} = ({outvartype}*)malloc(sizeof({outvartype}));")
-							return f"*{tc[2]} = {res};", ""
-						if tc[0] == "var":
-							outvartype = parser.convert_types_enum_to_string(vartype)
-							if vartype == Types.String:
-								self.symbol_table.set_variable(tc[1], res, vartype, False, len(res) - 1)
-								return f"char {tc[1]}[{len(res) - 1}] = {res};", ""
-							if vartype == Types.Dynamic:
-								# var[0] a[1] =[2] new[3] Dynamic[4] (memsize)[5]
-								self.symbol_table.set_variable(tc[1], res, vartype, False)
-								args = parser.parse_string_list(tc[5:])
-								args = args[1:-1]
-								varval = parser.parse_string_list(args)
-								intval = parser.try_parse_int(varval)
-								if isinstance(intval, int):
-									if intval >= 2147483647 or intval <= -2147483647:
-										if intval >= 9223372036854775807 or intval <= -9223372036854775807:
-											bytesize = 16
-										else: bytesize = 8
-									else: bytesize = 4
-								else:
-									bytesize = len(varval) - 1
-								return f"void* {tc[1]} = (void*){varval};", ""
-							self.symbol_table.set_variable(tc[1], res, vartype, False)
-							return f"{outvartype} {tc[1]} = {res};", ""
-						if vartype == Types.String:
-								self.symbol_table.set_variable(tc[1], res, vartype, False, len(res) - 1)
-								return f"char {tc[1]}[{len(res) - 1}] = {res};", ""
-						if vartype == Types.Dynamic:
-							# dynamic[0] a[1] =[2] new[3] Dynamic[4] (memsize)[5]
-							self.symbol_table.set_variable(tc[1], res, vartype, False)
-							args = parser.parse_string_list(tc[5:])
-							args = args[1:-1]
-							varval = parser.parse_string_list(args)
-							intval = parser.try_parse_int(varval)
-							if isinstance(intval, int):
-								if intval >= 2147483647 or intval <= -2147483647:
-									if intval >= 9223372036854775807 or intval <= -9223372036854775807:
-										bytesize = 16
-									else: bytesize = 8
-								else: bytesize = 4
-							else:
-								bytesize = len(varval) - 1
-							return f"void* {tc[1]} = (void*){varval};", ""
-						self.symbol_table.set_variable(tc[1], res, vartype, isHeap)
-						return f"{tc[0]} {tc[1]} = {res};", ""
-					except IndexError:
-						# var(0) a(1)			(Stack allocation)
-						# int(0) heap(1) a(2)	(Heap allocation)
-						# string(0) heap(1) a(2) 20(3) (String heap allocation)
-						if tc[0] == "var":
-							self.raise_transpile_error("InvalidSyntax: Initial value needed for var keyword", ln)
-						vartype = parser.parse_type_string(tc[0])
-						if vartype == Exceptions.InvalidSyntax:
-							self.raise_transpile_error("InvalidSyntax: Invalid type", ln)
-						if tc[1] == "heap":
-							if vartype == Types.String:
-								self.symbol_table.set_variable(tc[2], None, vartype, True, int(tc[3]))
-								if "string.h" not in libraryIncluded:
-									libraryIncluded.append("string.h")
-								return f"char *{tc[2]} = (char*)malloc({tc[3]});", ""
-							self.symbol_table.set_variable(tc[2], None, vartype, True)
-							return f"{tc[0]} *{tc[2]} = ({tc[0]}*)malloc(sizeof({tc[0]}));", ""
-						self.symbol_table.set_variable(tc[1], None, vartype, False)
-						return f"{tc[0]} {tc[1]};", ""
-				elif tc[0] == "print":
-					value = ""
-					for i in tc[1:multiple_commands_index + 1]:
-						value += i + " "
-					value = value[:-1]
-					if not value.startswith('('): # Check If the expression has parentheses around or not
-						return paren_needed, Exceptions.InvalidSyntax # Return error if not exists
-					if not value.endswith(')'): # Check If the expression has parentheses around or not
-						return close_paren_needed, Exceptions.InvalidSyntax # Return error if not exists
-					value = value[1:-1]
-					svalue = value.split()
-					value = str(value)
-					return f"printf({value});", None
-				elif tc[0] == "input":
-					value = ""
-					for i in tc[2:multiple_commands_index + 1]: # Get all parameters provided as 1 long string
-						value += i + " "
-					value = value[:-1]
-					if not value.startswith('('): # Check If the expression has parentheses around or not
-						self.raise_transpile_error(paren_needed, ln) # Return error if not exists
-					if not value.endswith(')'): # Check If the expression has parentheses around or not
-						self.raise_transpile_error(close_paren_needed, ln) # Return error if not exists
-					value = value[1:-1] # Cut parentheses out of the string
-					return f"scanf(\"%s\", &{varcontext})", {int(tc[1])} # Return the Recieved Input
-				elif tc[0] == "if":
-					return self.if_else_statement(tc, ln)
-				elif tc[0] == "exit":
-					value = ""
-					for i in tc[1:multiple_commands_index + 1]: # Get all parameters provided as 1 long string
-						value += i + " "
-					value = value[:-1]
-					if not value.startswith('('): # Check If the expression has parentheses around or not
-						self.raise_transpile_error(paren_needed, ln) # Return error if not exists
-					if not value.endswith(')'): # Check If the expression has parentheses around or not
-						self.raise_transpile_error(close_paren_needed, ln) # Return error if not exists
-					value = value[1:-1]
-					valtype = parser.parse_type_from_value(value)
-					if value.startswith('"'):
-						self.raise_transpile_error("InvalidValue: Exit code can only be integer.", ln)
-					if value.endswith('"'):
-						self.raise_transpile_error("InvalidValue: Exit code can only be integer.", ln)
-					if not value:
-						self.raise_transpile_error("InvalidValue: Parameter \"status\" (int) required.", ln)
-					return f"exit({int(value)});", valtype
-				elif tc[0] == "#define":
-					try:
-						# Set Interpreter Settings
-						if tc[1] == "interpet" and tc[2] == "ignoreInfo":
-							self.symbol_table.ignoreInfo = bool(tc[3] == "true")
-							return "", ""
-					except IndexError:
-						self.raise_transpile_error("InvalidValue: You needed to describe what you will change.", ln)
-				elif tc[0] == "throw":
-					return self.throw_keyword(tc, multiple_commands_index) # Go to the Throw keyword function
-				elif tc[0] == "del":
-					if tc[1] not in all_variable_name:
-						self.raise_transpile_error(f"NotDefinedException: The variable {tc[1]} is not defined.", ln)
-					if not self.symbol_table.get_variable(tc[1])[2]:
-						self.raise_transpile_error(f"InvalidValue: The variable {tc[1]} is not heap allocated.", ln)
-					return f"free({tc[1]});", ""
-				elif tc[0] == "loopfor":
-					try:
-						commands = [] # list of commands
-						command = []
-						endkeywordcount = 0 # All "end" keyword in the expression
-						endkeywordpassed = 0 # All "end" keyword passed
-						for i in tc[2:]:
-							if i == "end":
-								endkeywordcount += 1
-						for i in tc[2:]:
-							if i == "&&":
-								commands.append(command)
-								command = []
-								continue
-							if i == "end":
-								endkeywordpassed += 1
-								if endkeywordcount == endkeywordpassed:
-									commands.append(command)
-									command = []
-									break
-							command.append(i)
-						genvarname = None
-						genvarname = "__sts_loopcount_"
-						genvarname += ascii_letters[randint(0, 51)]
-						genvarname += ascii_letters[randint(0, 51)]
-						genvarname += ascii_letters[randint(0, 51)]
-						self.file_helper.insert_content(f"for (int {genvarname} = 0; {genvarname} < {int(tc[1])}; {genvarname}++)" + " {")
-						self.file_helper.indent_level += 1
-						for i in commands:
-							self.file_helper.insert_content(self.analyseCommand(i)[0])
-						self.file_helper.indent_level -= 1
-						self.file_helper.insert_content("}")
-						return "", ""
-					except ValueError:
-						self.raise_transpile_error("InvalidValue: Count must be an Integer. (Whole number)", ln)
-				elif tc[0] == "switch":
-					return self.switch_case_statement(tc, ln)
-				else:
-					self.raise_transpile_error("NotImplementedException: This feature is not implemented", ln)
-			elif tc[0] in all_function_name:
-				return parser.parse_string_list(tc), ""
-			elif tc[0] == "//":
-				return parser.parse_string_list(tc), ""
-			else:
-				return parser.parse_string_list(tc), ""
+					return ast.RawCode(ln, join_tokens(tc))
+			handler = self.keyword_handlers.get(keyword)
+			if handler is not None:
+				return handler(tc, ln, varcontext)
+			return ast.RawCode(ln, join_tokens(tc))
 		except IndexError:
-			return "", ""
\ No newline at end of file
+			return ast.RawCode(ln, "")
@@ -0,0 +1,551 @@
+import langParser as parser
+import astnodes as ast
+from langEnums import Types, TokenType, Exceptions
+from tokenizer import tokenize_line
+import re
+
+INT_MIN = -2147483648
+INT_MAX = 2147483647
+IDENTIFIER_REGEX = re.compile(r"[A-Za-z_]\w*")
+STRING_LITERAL_REGEX = re.compile(r"\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'")
+
+def parse_number(value):
+	""" Returns the Python value of a number literal. None If the C compiler could read it differently. """
+	if "." in value:
+		return float(value)
+	if len(value) > 1 and value.startswith("0"): # Octal in C
+		return None
+	return int(value)
+
+def c_divide(left, right):
+	""" Divide like C does. Integer division rounds toward zero. """
+	if isinstance(left, int) and isinstance(right, int):
+		quotient = abs(left) // abs(right)
+		return quotient if (left < 0) == (right < 0) else -quotient
+	return left / right
+
+def calculate(left, operator, right):
+	""" Returns the result of an arithmetic operator like C does. None If it can't be computed at transpile time. """
+	if operator in {"/", "%"} and right == 0:
+		return None
+	if operator == "+":
+		result = left + right
+	elif operator == "-":
+		result = left - right
+	elif operator == "*":
+		result = left * right
+	elif operator == "/":
+		result = c_divide(left, right)
+	elif operator == "%":
+		if not (isinstance(left, int) and isinstance(right, int)):
+			return None
+		result = left - right * c_divide(left, right)
+	else:
+		return None
+	if isinstance(result, int) and not INT_MIN <= result <= INT_MAX:
+		return None
+	if isinstance(result, float) and (result != result or result in {float("inf"), float("-inf")}):
+		return None
+	return result
+
+class ExpressionEvaluator:
+	"""
+	Evaluates arithmetic expressions made of number literals, Known variables, Parentheses and + - * / %.
+	evaluate() returns None If the expression is not constant.
+	"""
+	def __init__(self, tokens, known_values):
+		self.tokens = tokens
+		self.known_values = known_values
+		self.index = 0
+
+	def evaluate(self):
+		if not self.tokens:
+			return None
+		result = self.expression()
+		if self.index != len(self.tokens):
+			return None
+		return result
+
+	def peek(self):
+		if self.index < len(self.tokens):
+			return self.tokens[self.index].value
+		return None
+
+	def expression(self):
+		result = self.term()
+		while result is not None and self.peek() in {"+", "-"}:
+			operator = self.tokens[self.index].value
+			self.index += 1
+			right = self.term()
+			if right is None:
+				return None
+			result = calculate(result, operator, right)
+		return result
+
+	def term(self):
+		result = self.unary()
+		while result is not None and self.peek() in {"*", "/", "%"}:
+			operator = self.tokens[self.index].value
+			self.index += 1
+			right = self.unary()
+			if right is None:
+				return None
+			result = calculate(result, operator, right)
+		return result
+
+	def unary(self):
+		token = self.peek()
+		if token == "-" or token == "+":
+			self.index += 1
+			value = self.unary()
+			if value is None:
+				return None
+			return calculate(0, token, value) if token == "-" else value
+		return self.primary()
+
+	def primary(self):
+		if self.index >= len(self.tokens):
+			return None
+		token = self.tokens[self.index]
+		self.index += 1
+		if token.value == "(":
+			result = self.expression()
+			if result is None or self.peek() != ")":
+				return None
+			self.index += 1
+			return result
+		if token.type == TokenType.Number:
+			return parse_number(token.value)
+		if token.type == TokenType.Name:
+			value = self.known_values.get(token.value)
+			if isinstance(value, int):
+				return value
+		return None
+
+def evaluate_expression(code, known_values):
+	""" Returns the value of an expression written in C code. None If it's not constant. """
+	return ExpressionEvaluator(tokenize_line(code), known_values).evaluate()
+
+def get_changed_names(nodes, names=None):
+	""" Returns the set of variable names that may be changed by the statements. """
+	if names is None:
+		names = set()
+	for node in nodes:
+		if isinstance(node, (ast.Assignment, ast.VariableDeclaration, ast.Delete)):
+			names.add(node.name)
+		elif isinstance(node, ast.RawCode):
+			names.update(IDENTIFIER_REGEX.findall(node.code))
+		elif isinstance(node, ast.IfStatement):
+			get_changed_names(node.body, names)
+			if node.else_body is not None:
+				get_changed_names(node.else_body, names)
+		elif isinstance(node, (ast.LoopFor, ast.Block)):
+			get_changed_names(node.body, names)
+		elif isinstance(node, ast.SwitchStatement):
+			for _, body in node.cases:
+				get_changed_names(body, names)
+			if node.default is not None:
+				get_changed_names(node.default, names)
+	return names
+
+class ConstantFolder:
+	"""
+	Folds constant arithmetic in values and removes the branches of if and switch statements that are never taken.
+	Keeps the values of the variables known at each point of the program while walking the statements in order.
+	Only stack allocated integers and string contents are tracked, And a variable is forgotten
+	as soon as a branch or a loop may change it.
+	"""
+	def __init__(self):
+		self.known_values = {}
+		self.optimizers = {
+			ast.VariableDeclaration: self.optimize_variable_declaration,
+			ast.Assignment: self.optimize_assignment,
+			ast.IfStatement: self.optimize_if_statement,
+			ast.LoopFor: self.optimize_loopfor,
+			ast.SwitchStatement: self.optimize_switch_statement,
+			ast.Block: self.optimize_block,
+			ast.RawCode: self.optimize_raw_code,
+			ast.Delete: self.optimize_delete
+		}
+
+	def optimize(self, node):
+		""" Returns the optimized node. """
+		optimizer = self.optimizers.get(type(node))
+		if optimizer is None:
+			return node
+		return optimizer(node)
+
+	def optimize_body(self, nodes):
+		return [self.optimize(i) for i in nodes]
+
+	def optimize_branch(self, nodes):
+		"""
+		Optimize the statements of a branch, Then restore the known values from before the branch.
+		Only the variables the branch may change are saved, So branches cost nothing for the other variables.
+		[RETURNS] a tuple of (statements, (names changed by the branch, known values of those names after the branch))
+		"""
+		changed = get_changed_names(nodes)
+		saved = {i: self.known_values[i] for i in changed if i in self.known_values}
+		body = self.optimize_body(nodes)
+		after = {i: self.known_values[i] for i in changed if i in self.known_values}
+		for i in changed:
+			self.known_values.pop(i, None)
+		self.known_values.update(saved)
+		return body, (changed, after)
+
+	def merge_branches(self, branches):
+		""" Keep the values that are the same after every branch. branches is a list of values returned by optimize_branch. """
+		for name in set().union(*(changed for changed, _ in branches)):
+			values = [after.get(name) if name in changed else self.known_values.get(name) for changed, after in branches]
+			first = values[0]
+			if first is not None and all(type(i) is type(first) and i == first for i in values):
+				self.known_values[name] = first
+			else:
+				self.known_values.pop(name, None)
+
+	def make_block(self, line, nodes):
+		""" Returns a Block of the statements of a taken branch. Scoped If the branch declares variables. """
+		scoped = any(isinstance(i, ast.VariableDeclaration) for i in nodes)
+		return ast.Block(line, self.optimize_body(nodes), scoped)
+
+	def fold_value(self, value):
+		""" Returns the value, Replaced with its result If it's a constant arithmetic expression. """
+		result = evaluate_expression(value, self.known_values)
+		if result is None:
+			return value, None
+		return repr(result), result
+
+	def get_string_value(self, code):
+		""" Returns the content of a string literal or a known string variable. None If unknown. """
+		if code.startswith('"'):
+			if len(code) < 2 or not code.endswith('"') or "\\" in code:
+				return None
+			return code[1:-1]
+		value = self.known_values.get(code)
+		if isinstance(value, str):
+			return value
+		return None
+
+	def optimize_variable_declaration(self, node):
+		self.known_values.pop(node.name, None)
+		if node.value is None:
+			return node
+		if node.vartype == Types.String:
+			value = self.get_string_value(node.value)
+			if value is not None and node.value.startswith('"'):
+				self.known_values[node.name] = value
+		elif node.vartype in {Types.Integer, Types.Float}:
+			node.value, result = self.fold_value(node.value)
+			if isinstance(result, int) and node.vartype == Types.Integer and not node.is_heap:
+				self.known_values[node.name] = result
+		return node
+
+	def optimize_assignment(self, node):
+		old_value = self.known_values.pop(node.name, None)
+		if node.vartype == Types.String:
+			value = self.get_string_value(node.value)
+			if value is not None and node.value.startswith('"'):
+				self.known_values[node.name] = value
+		elif node.vartype in {Types.Integer, Types.Float}:
+			node.value, result = self.fold_value(node.value)
+			if isinstance(result, int) and node.vartype == Types.Integer and not node.is_heap:
+				if node.operator != "=":
+					result = calculate(old_value, node.operator, result) if isinstance(old_value, int) else None
+				if result is not None:
+					self.known_values[node.name] = result
+		return node
+
+	def evaluate_comparison(self, condition):
+		""" Returns the result of a single condition. None If it's not constant. """
+		if condition.is_string:
+			left = self.get_string_value(condition.left)
+			right = self.get_string_value(condition.right)
+		else:
+			left = evaluate_expression(condition.left, self.known_values)
+			if condition.operator is None:
+				return None if left is None else bool(left)
+			right = evaluate_expression(condition.right, self.known_values)
+		if left is None or right is None:
+			return None
+		result = parser.compare_values(left, condition.operator, right)
+		if result == Exceptions.InvalidSyntax:
+			return None
+		return result
+
+	def evaluate_conditions(self, node):
+		""" Returns the result of all conditions of an if statement. None If it's not constant. """
+		results = [self.evaluate_comparison(i) for i in node.conditions]
+		# A condition that's not constant may call a function, Which can't be removed.
+		for condition, result in zip(node.conditions, results):
+			if result is None and "(" in f"{condition.left} {condition.right}":
+				return None
+		# "and" has higher precedence than "or" in C
+		groups = [[results[0]]]
+		for connective, result in zip(node.connectives, results[1:]):
+			if connective == "and":
+				groups[-1].append(result)
+			else:
+				groups.append([result])
+		group_results = []
+		for group in groups:
+			if False in group:
+				group_results.append(False)
+			elif None in group:
+				group_results.append(None)
+			else:
+				group_results.append(True)
+		if True in group_results:
+			return True
+		if None in group_results:
+			return None
+		return False
+
+	def optimize_if_statement(self, node):
+		result = self.evaluate_conditions(node)
+		if result is True:
+			return self.make_block(node.line, node.body)
+		if result is False:
+			return self.make_block(node.line, node.else_body or [])
+		node.body, after_if = self.optimize_branch(node.body)
+		after_else = (set(), {})
+		if node.else_body is not None:
+			node.else_body, after_else = self.optimize_branch(node.else_body)
+		self.merge_branches([after_if, after_else])
+		return node
+
+	def optimize_loopfor(self, node):
+		if node.count <= 0:
+			return ast.Block(node.line, [])
+		# The values changed inside the loop are different on each iteration.
+		for i in get_changed_names(node.body):
+			self.known_values.pop(i, None)
+		node.body, _ = self.optimize_branch(node.body)
+		return node
+
+	def optimize_switch_statement(self, node):
+		value = evaluate_expression(node.value, self.known_values)
+		keys = [evaluate_expression(key, {}) for key, _ in node.cases]
+		if isinstance(value, int) and all(isinstance(i, int) for i in keys):
+			for key, (_, body) in zip(keys, node.cases):
+				if key == value:
+					return self.make_block(node.line, body)
+			return self.make_block(node.line, node.default or [])
+		branches = []
+		cases = []
+		for key, body in node.cases:
+			body, after_case = self.optimize_branch(body)
+			cases.append((key, body))
+			branches.append(after_case)
+		node.cases = cases
+		if node.default is not None:
+			node.default, after_default = self.optimize_branch(node.default)
+			branches.append(after_default)
+		else:
+			branches.append((set(), {})) # No case taken
+		self.merge_branches(branches)
+		return node
+
+	def optimize_block(self, node):
+		node.body = self.optimize_body(node.body)
+		return node
+
+	def optimize_raw_code(self, node):
+		for i in IDENTIFIER_REGEX.findall(node.code):
+			self.known_values.pop(i, None)
+		return node
+
+	def optimize_delete(self, node):
+		self.known_values.pop(node.name, None)
+		return node
+
+def count_statements(nodes):
+	""" Returns the number of statements written for the nodes, Counting the statements inside blocks. """
+	count = 0
+	for node in nodes:
+		if isinstance(node, ast.Block):
+			count += count_statements(node.body)
+			continue
+		count += 1
+		if isinstance(node, ast.IfStatement):
+			count += count_statements(node.body)
+			if node.else_body is not None:
+				count += count_statements(node.else_body)
+		elif isinstance(node, ast.LoopFor):
+			count += count_statements(node.body)
+		elif isinstance(node, ast.SwitchStatement):
+			for _, body in node.cases:
+				count += count_statements(body)
+			if node.default is not None:
+				count += count_statements(node.default)
+	return count
+
+def has_loop_control(nodes):
+	""" Returns If the statements contain a break or continue that belongs to the loop around them. """
+	for node in nodes:
+		if isinstance(node, ast.RawCode):
+			names = IDENTIFIER_REGEX.findall(node.code)
+			if "break" in names or "continue" in names:
+				return True
+		elif isinstance(node, ast.IfStatement):
+			if has_loop_control(node.body) or (node.else_body is not None and has_loop_control(node.else_body)):
+				return True
+		elif isinstance(node, ast.Block):
+			if has_loop_control(node.body):
+				return True
+		elif isinstance(node, ast.SwitchStatement):
+			# break inside a switch leaves the switch, But continue still continues the loop.
+			for _, body in node.cases + [(None, node.default or [])]:
+				for i in body:
+					if isinstance(i, ast.RawCode) and "continue" in IDENTIFIER_REGEX.findall(i.code):
+						return True
+	return False
+
+class LoopUnroller:
+	"""
+	Unrolls loopfor loops whose unrolled body has at most threshold statements.
+	Loops too big to unroll fully are unrolled partially, Running several copies of the body per iteration.
+	A loop whose body is only another loop is fused into a single loop first.
+	Run it after the ConstantFolder, The copies of the body share the same nodes.
+	"""
+	def __init__(self, threshold=16):
+		self.threshold = threshold
+
+	def optimize(self, node):
+		""" Returns the optimized node. """
+		if isinstance(node, ast.LoopFor):
+			return self.optimize_loopfor(node)
+		if isinstance(node, ast.IfStatement):
+			node.body = self.optimize_body(node.body)
+			if node.else_body is not None:
+				node.else_body = self.optimize_body(node.else_body)
+		elif isinstance(node, ast.SwitchStatement):
+			node.cases = [(key, self.optimize_body(body)) for key, body in node.cases]
+			if node.default is not None:
+				node.default = self.optimize_body(node.default)
+		elif isinstance(node, ast.Block):
+			node.body = self.optimize_body(node.body)
+		return node
+
+	def optimize_body(self, nodes):
+		return [self.optimize(i) for i in nodes]
+
+	def copy_body(self, node, times):
+		""" Returns the statements of the loop body repeated. Each copy is scoped If the body declares variables. """
+		if any(isinstance(i, ast.VariableDeclaration) for i in node.body):
+			return [ast.Block(node.line, node.body, True) for _ in range(times)]
+		return node.body * times
+
+	def optimize_loopfor(self, node):
+		# loopfor 10 loopfor 10 ... end end runs the inner body 100 times.
+		while len(node.body) == 1 and isinstance(node.body[0], ast.LoopFor):
+			inner = node.body[0]
+			if node.count * inner.count > INT_MAX or has_loop_control(inner.body):
+				break
+			node = ast.LoopFor(node.line, node.count * inner.count, inner.body)
+		node.body = self.optimize_body(node.body)
+		if has_loop_control(node.body):
+			return node
+		if node.count <= 0:
+			return ast.Block(node.line, [])
+		body_size = count_statements(node.body)
+		if body_size == 0:
+			return ast.Block(node.line, [])
+		if node.count * body_size <= self.threshold:
+			return ast.Block(node.line, self.copy_body(node, node.count))
+		factor = min(node.count, self.threshold // body_size)
+		if factor < 2:
+			return node
+		loop = ast.LoopFor(node.line, node.count // factor, self.copy_body(node, factor))
+		return ast.Block(node.line, [loop] + self.copy_body(node, node.count % factor))
+
+class HeapDemoter:
+	"""
+	Moves heap variables to the stack when their size is known and they never escape:
+	They are only declared, Set, Deleted and compared as strings. Any other use, Like in a print or in raw C code,
+	Could need the pointer, So the variable stays on the heap. Heap strings get an array as big as the biggest value set.
+	Needs the whole program, Call optimize with all the statements of the file.
+	"""
+	DEMOTABLE_TYPES = frozenset((Types.Integer, Types.Float, Types.Boolean, Types.String))
+
+	def __init__(self):
+		self.candidates = set() # Names of the heap variables that can be demoted
+		self.escaped = set() # Names used in a way that needs the pointer
+		self.capacities = {} # Name of a heap string to the biggest size it needs
+
+	def optimize(self, nodes):
+		""" Returns the statements with the non-escaping heap variables moved to the stack. """
+		self.scan(nodes)
+		return self.rewrite(nodes, self.candidates - self.escaped)
+
+	def mark_escapes(self, code):
+		""" Every name used in C code may need the pointer of a heap variable. """
+		if code is not None:
+			self.escaped.update(IDENTIFIER_REGEX.findall(STRING_LITERAL_REGEX.sub("", str(code))))
+
+	def add_capacity(self, name, size):
+		self.capacities[name] = max(self.capacities.get(name, 0), size)
+
+	def scan(self, nodes):
+		for node in nodes:
+			if isinstance(node, ast.VariableDeclaration):
+				if node.is_heap:
+					if node.vartype in self.DEMOTABLE_TYPES and (node.vartype != Types.String or isinstance(node.size, int)):
+						self.candidates.add(node.name)
+						if node.vartype == Types.String:
+							self.add_capacity(node.name, node.size)
+					else:
+						self.escaped.add(node.name)
+				self.mark_escapes(node.value)
+			elif isinstance(node, ast.Assignment):
+				if node.is_heap and node.vartype == Types.String:
+					self.add_capacity(node.name, node.size)
+				self.mark_escapes(node.value)
+			elif isinstance(node, ast.IfStatement):
+				for condition in node.conditions:
+					for operand in (condition.left, condition.right):
+						# strcmp works the same on a pointer and an array.
+						if not (condition.is_string and operand is not None and IDENTIFIER_REGEX.fullmatch(operand)):
+							self.mark_escapes(operand)
+				self.scan(node.body)
+				if node.else_body is not None:
+					self.scan(node.else_body)
+			elif isinstance(node, (ast.LoopFor, ast.Block)):
+				self.scan(node.body)
+			elif isinstance(node, ast.SwitchStatement):
+				self.mark_escapes(node.value)
+				for key, body in node.cases:
+					self.mark_escapes(key)
+					self.scan(body)
+				if node.default is not None:
+					self.scan(node.default)
+			elif isinstance(node, ast.RawCode):
+				self.mark_escapes(node.code)
+			elif isinstance(node, (ast.Print, ast.Exit)):
+				self.mark_escapes(node.value if isinstance(node, ast.Print) else node.code)
+
+	def rewrite(self, nodes, demoted):
+		out = []
+		for node in nodes:
+			if isinstance(node, ast.Delete) and node.name in demoted:
+				continue # Stack variables are freed at the end of their block.
+			if isinstance(node, ast.VariableDeclaration) and node.name in demoted:
+				node.is_heap = False
+				node.check_capacity = False
+				if node.vartype == Types.String:
+					node.size = self.capacities[node.name]
+			elif isinstance(node, ast.Assignment) and node.name in demoted:
+				node.is_heap = False
+				node.reallocate = False
+				node.check_capacity = False
+			elif isinstance(node, ast.IfStatement):
+				node.body = self.rewrite(node.body, demoted)
+				if node.else_body is not None:
+					node.else_body = self.rewrite(node.else_body, demoted)
+			elif isinstance(node, (ast.LoopFor, ast.Block)):
+				node.body = self.rewrite(node.body, demoted)
+			elif isinstance(node, ast.SwitchStatement):
+				node.cases = [(key, self.rewrite(body, demoted)) for key, body in node.cases]
+				if node.default is not None:
+					node.default = self.rewrite(node.default, demoted)
+			out.append(node)
+		return out
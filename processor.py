@@ -1,11 +1,37 @@
-from lexer import Lexer, SymbolTable, libraryIncluded
-from tqdm import tqdm
-from time import perf_counter
-import tracemalloc
-import argparse
+from transpiler import TranspileContext
+from buildcache import BuildCache
+from tokenizer import tokenize_line
+from time import perf_counter, sleep
+from hashlib import sha256
+from glob import glob
+import os
 
-GlobalVariableTable = SymbolTable()
-STORYSCRIPT_INTERPRETER_DEBUG_MODE = True
+# tqdm, tracemalloc, The process pool, The profiler and the statistics are imported only when used,
+# So quiet runs (--release) don't pay for them at startup.
+
+TRANSPILER_VERSION = "Alpha 1"
+# The modules the generated code depends on. Their code is a part of the cache key, So changing them invalidates the cache.
+TRANSPILER_SOURCES = (
+	"astnodes.py", "cgenerator.py", "filehelper.py", "langEnums.py", "langParser.py", "lexer.py", "optimizer.py", "processor.py",
+	"tokenizer.py", "transpiler.py"
+)
+transpiler_digest = None
+# Set the STORYSCRIPT_DEBUG environment variable to 0 to turn off the debug messages.
+STORYSCRIPT_INTERPRETER_DEBUG_MODE = os.environ.get("STORYSCRIPT_DEBUG", "1") != "0"
+
+def get_transpiler_digest():
+	""" Returns the hash of TRANSPILER_VERSION and the code of TRANSPILER_SOURCES. The files are read once per process. """
+	global transpiler_digest
+	if transpiler_digest is None:
+		digest = sha256(TRANSPILER_VERSION.encode())
+		directory = os.path.dirname(os.path.abspath(__file__))
+		for i in TRANSPILER_SOURCES:
+			with open(os.path.join(directory, i), "rb") as f:
+				source = f.read()
+			digest.update(f"\0{i}\0{len(source)}\0".encode())
+			digest.update(source)
+		transpiler_digest = digest.hexdigest()
+	return transpiler_digest
 
 def parse_string_list(self, command):
 	res = ""
@@ -14,7 +40,7 @@ def parse_string_list(self, command):
 	res = res[:-1]
 	return res
 
-def parse_file(out_file, file_name, auto_reallocate=True, minified=False):
+def parse_file(out_file, file_name, auto_reallocate=True, minified=False, symbol_table=None, quiet=False, cache=None, stream_lines=None, constant_folding=True, unroll_threshold=None, heap_to_stack=False, string_growth=2.0, runtime_string_capacity=False, line_directives=False, source_map=False, stats=None, profiler=None, diagnostics=None):
 	"""
 	This method read the file and give it to the Parser, Then write the output data to file.
 	[PARAMETERS]
@@ -22,81 +48,144 @@ def parse_file(out_file, file_name, auto_reallocate=True, minified=False):
 	file_name = Input file name
 	auto_reallocate = Turn on auto memory reallocation in the Output code or not.
 	minified = Tell the file writer to minify the file or not.
+	symbol_table = The SymbolTable to use. Defaults to a new one, So nothing is shared between calls.
+	quiet = Do not print progress, debug messages and statistics.
+	cache = The BuildCache to reuse the output from. None to disable caching.
+	stream_lines = Flush the generated code to disk every time this many lines are generated. None to keep it in memory until the end.
+	constant_folding = Fold constant expressions and remove the if and switch branches that are never taken.
+	unroll_threshold = Unroll loopfor loops up to this many statements after unrolling. None to keep the loops.
+	heap_to_stack = Move the heap variables that never escape to the stack.
+	string_growth = Heap strings that are too small grow to at least their capacity times this. 1 to reallocate to the exact length.
+	runtime_string_capacity = Check the capacity of heap strings in the output code, Instead of at transpile time.
+	line_directives = Insert #line directives pointing at the lines of the input file, So debuggers and profilers show them.
+	source_map = Write the input line of every output line to out_file + ".map", See sourcemap.py. The cache is not used then.
+	stats = a TranspileStats to record the time of each phase and the counters into. None to not record them.
+	profiler = a Profiler to time the Lexer handlers, The optimizer passes, The code generation and each line with. None to not profile.
+	diagnostics = a DiagnosticCollector to record every error and warning into, Going on after the errors.
+		The output file is not written If there are errors. None to stop at the first error. The cache is not used then,
+		As the warnings of a file are only found by transpiling it.
+	[RETURNS] Number of lines processed (0 on a cache hit). None If the input file cannot be opened.
 	"""
-	tracemalloc.start()
+	if not quiet:
+		# Import the progress bar before the memory tracking and the timer start, So they only measure the transpile.
+		from tqdm import tqdm
+		import tracemalloc
+		tracemalloc.start()
 	start_time = perf_counter()
-	if STORYSCRIPT_INTERPRETER_DEBUG_MODE: # Check if the run mode was Debug mode or not.
-		from os import getcwd
-		print("[DEBUG] Current Working Directory: " + getcwd()) # Prints the current working directory
+	if STORYSCRIPT_INTERPRETER_DEBUG_MODE and not quiet: # Check if the run mode was Debug mode or not.
+		print("[DEBUG] Current Working Directory: " + os.getcwd()) # Prints the current working directory
 	try:
 		f = open(file_name, "r") # Try open the file
 	except FileNotFoundError:
-		print(f"Cannot open file {fileName}. File does not exist.") # Print the error and terminate the function If the file does not exist.
-		return
-	if STORYSCRIPT_INTERPRETER_DEBUG_MODE and not auto_reallocate:
+		print(f"Cannot open file {file_name}. File does not exist.") # Print the error and terminate the function If the file does not exist.
+		return None
+	cache_key = None
+	if source_map or diagnostics is not None: # The map and the diagnostics are not cached.
+		cache = None
+	if cache is not None:
+		cache_key = cache.make_key(
+			file_name, get_transpiler_digest(), auto_reallocate, minified, constant_folding, unroll_threshold, heap_to_stack, string_growth,
+			runtime_string_capacity, line_directives and file_name
+		)
+		if cache.get_file(cache_key, out_file):
+			f.close()
+			if stats is not None:
+				stats.cache_hit = True
+				stats.emitted_bytes = os.path.getsize(out_file)
+			if not quiet:
+				print("Cache hit. Reused the previous output.")
+				tracemalloc.stop()
+			return 0
+	if STORYSCRIPT_INTERPRETER_DEBUG_MODE and not auto_reallocate and not quiet:
 		# a Debug message telling that autoreallocate is turned off.
 		print("[DEBUG] Auto reallocate turned off.")
-	# Creates a new Lexer for the Parsing operation
-	lexer = Lexer(GlobalVariableTable, out_file, auto_reallocate=auto_reallocate)
-	lexer.file_helper.minified = minified
-	# Read all the lines from the file
-	lines = f.readlines()
+	# Creates a new context holding the Lexer for the Parsing operation, And a CGenerator to turn its output into C code.
+	context = TranspileContext(
+		out_file, auto_reallocate, minified, stream_lines, constant_folding, unroll_threshold, heap_to_stack,
+		string_growth, runtime_string_capacity, symbol_table, diagnostics=diagnostics,
+		line_directives=file_name if line_directives else None, source_map=source_map
+	)
+	generator = context.generator
+	if stats is not None:
+		stats.count_keywords(context.lexer)
+	tokenize = tokenize_line
+	if profiler is not None:
+		profiler.instrument_lexer(context.lexer)
+		profiler.instrument(generator, ("generate",))
+		if context.folder is not None:
+			context.folder.optimize = profiler.wrap("ConstantFolder.optimize", context.folder.optimize)
+		if context.unroller is not None:
+			context.unroller.optimize = profiler.wrap("LoopUnroller.optimize", context.unroller.optimize)
+		tokenize = profiler.wrap("tokenize_line", tokenize_line)
+	# Read the lines from the file lazily, One line at a time.
+	lines = f
 	line_index = 0
-	print("Conversion starting...")
-	# Looping through all lines. While using tqdm to update the progress bar as well.
-	for i in tqdm(lines, ncols=75):
-		line_index += 1
-		commands = i.split()
-		# Insert the returned C code into the File content.
-		try:
-			if minified and len(commands) != 0 and commands[0] == "//":
-				continue
-			lexer.file_helper.insert_content(lexer.analyseCommand(commands, ln=line_index)[0])
-		except Exception:
-			from traceback import print_exc
-			print_exc()
-			print(commands)
-	print("Conversion done. Writing data to file...")
-	# Include all libraries
-	for i in libraryIncluded:
-		lexer.file_helper.insert_header(f"#include <{i}>")
-	# Add Exception raising functionality to the C code
-	lexer.file_helper.insert_header('''
-// Exception Raising
-void raiseException(int code, char* description)
-{
-	switch(code)
-	{
-		case 100:
-			printf("InvalidSyntax: %s", description);
-			break;
-		case 101:
-			printf("AlreadyDefined: %s", description);
-			break;
-		case 102:
-			printf("NotImplementedException %s", description);
-			break;
-		case 103:
-			printf("NotDefinedException: %s", description);
-			break;
-		case 104:
-			printf("GeneralException: %s", description);
-			break;
-		case 105:
-			printf("DivideByZeroException: %s", description);
-			break;
-		case 106:
-			printf("InvalidValue: %s", description);
-			break;
-		case 107:
-			printf("InvalidTypeException: %s", description);
-			break;
-	}
-	exit(code);
-}
-''')
-	lexer.file_helper.insert_header("int main() {")
-	lexer.file_helper.write_data_to_file()
+	line_failed = False # Did a line raise an unexpected exception
+	if not quiet:
+		print("Conversion starting...")
+		# Use tqdm to update the progress bar while looping through all lines.
+		lines = tqdm(lines, ncols=75)
+	# The Body streamed to a temporary file is removed If the output is not written, Even when an error exits.
+	written = False
+	try:
+		with f:
+			if stats is not None:
+				read_start = perf_counter()
+			for i in lines:
+				line_index += 1
+				if profiler is not None:
+					profiler.begin_line()
+				if stats is not None:
+					tokenize_start = perf_counter()
+					stats.phases["read"] += tokenize_start - read_start
+				commands = tokenize(i, line_index)
+				if stats is not None:
+					generate_start = perf_counter()
+					stats.phases["tokenize"] += generate_start - tokenize_start
+					stats.count_command(commands)
+				# Parse the line, Then insert its C code into the File content.
+				try:
+					context.process_tokens(commands, line_index)
+				except Exception:
+					from traceback import print_exc
+					print_exc()
+					print(commands)
+					line_failed = True
+				if profiler is not None:
+					profiler.end_line(line_index, i)
+				if stats is not None:
+					read_start = perf_counter()
+					stats.phases["lex_generate"] += read_start - generate_start
+		if not quiet:
+			print("Conversion done. Writing data to file...")
+		# The lines kept for --heap-to-stack are generated here, Then the libraries and the runtime functions are included.
+		finish_start = perf_counter()
+		context.finish_body()
+		header_start = perf_counter()
+		generator.write_header()
+		if diagnostics is not None and diagnostics.has_errors():
+			if not quiet:
+				print("Conversion failed. The output file was not written.")
+				tracemalloc.stop()
+			return line_index
+		write_start = perf_counter()
+		generator.file_helper.write_data_to_file()
+		written = True
+	finally:
+		if not written:
+			generator.file_helper.discard()
+	if source_map:
+		from sourcemap import write_source_map
+		write_source_map(out_file + ".map", out_file, file_name, context.get_source_map())
+	if stats is not None:
+		stats.phases["lex_generate"] += header_start - finish_start
+		stats.phases["header"] += write_start - header_start
+		stats.phases["write"] += perf_counter() - write_start
+		stats.emitted_bytes = os.path.getsize(out_file)
+	if cache is not None and not line_failed: # The output of a failed line is not trusted
+		cache.put_file(cache_key, out_file)
+	if quiet:
+		return line_index
 	print("Successfully written data to file.")
 	# Prints out statistics when done running.
 	print(" -- Statistics -- ")
@@ -108,20 +197,231 @@ void raiseException(int code, char* description)
 	print("-"*40)
 	# Stop the memory allocation tracking
 	tracemalloc.stop()
+	return line_index
+
+def get_pattern_root(pattern):
+	""" Returns the directory the files matched by a glob pattern are under: Its path before the first part with a wildcard. """
+	root = []
+	for part in os.path.normpath(pattern).split(os.sep):
+		if any(i in part for i in "*?["):
+			if root == [""]: # Absolute pattern with a wildcard right under the filesystem root
+				return os.sep
+			return os.sep.join(root) or "."
+		root.append(part)
+	return os.path.dirname(pattern) or "."
+
+def collect_input_files(patterns):
+	"""
+	Expand the input arguments into a sorted list of StoryScript files.
+	[PARAMETER] patterns: File paths, Directories (searched recursively for .sts files) or glob patterns.
+	[RETURNS] a dict of each file path, Without duplicates, To the root its output path is made relative to:
+		The directory or the part of the glob pattern before the wildcards that matched it, Or the directory of a file path.
+	"""
+	files = {}
+	for pattern in patterns:
+		if os.path.isdir(pattern):
+			root = pattern
+			matches = sorted(glob(os.path.join(pattern, "**", "*.sts"), recursive=True))
+		elif os.path.isfile(pattern):
+			root = os.path.dirname(pattern) or "."
+			matches = [pattern]
+		else:
+			root = get_pattern_root(pattern)
+			matches = sorted(i for i in glob(pattern, recursive=True) if os.path.isfile(i))
+		for i in matches:
+			if i not in files:
+				files[i] = root
+	return files
+
+def get_output_path(in_file, out_dir, root=None):
+	"""
+	Returns the output C file path of an input file inside the output directory.
+	The path of the input file relative to the root is kept, So files with the same name in different directories don't clash.
+	Without a root, Only the file name is kept.
+	"""
+	if root is None:
+		name = os.path.basename(in_file)
+	else:
+		name = os.path.relpath(in_file, root)
+	return os.path.join(out_dir, os.path.splitext(name)[0] + ".c")
+
+def get_output_paths(in_files, out_dir):
+	"""
+	Returns the output path of every input file. See get_output_path.
+	[PARAMETER] in_files: a list of input files, Or a dict of input file to its root as returned by collect_input_files.
+	Raises ValueError If two input files would be written to the same output file.
+	"""
+	roots = in_files if isinstance(in_files, dict) else {}
+	out_files = []
+	written_by = {} # Normalized output path to the input file written to it
+	for i in in_files:
+		out_file = get_output_path(i, out_dir, roots.get(i))
+		key = os.path.normcase(os.path.abspath(out_file))
+		if key in written_by:
+			raise ValueError(f"{written_by[key]} and {i} would both be written to {out_file}")
+		written_by[key] = i
+		out_files.append(out_file)
+	return out_files
+
+def transpile_job(job):
+	"""
+	Transpile a single file. Every parse_file call has its own Symbol table and included libraries.
+	This is the unit of work sent to the worker processes by parse_files.
+	[PARAMETER] job: a tuple of (in_file, out_file, options). options is a dict of keyword arguments for parse_file.
+		If options["stats"] is True, The statistics of the file are recorded into a new TranspileStats.
+		If options["diagnostics"] is True, Every error and warning of the file is recorded into a new DiagnosticCollector.
+	[RETURNS] a tuple of (in_file, out_file, lines processed, time elapsed, error message or None, statistics dict or None, diagnostics dict or None)
+	"""
+	in_file, out_file, options = job
+	stats = None
+	if options.get("stats"):
+		from transpilestats import TranspileStats
+		stats = TranspileStats(in_file, out_file)
+	diagnostics = None
+	if options.get("diagnostics"):
+		from diagnostics import DiagnosticCollector
+		diagnostics = DiagnosticCollector(in_file)
+	options = dict(options, stats=stats, diagnostics=diagnostics)
+	start_time = perf_counter()
+	try:
+		line_count = parse_file(out_file, in_file, quiet=True, **options)
+	except (Exception, SystemExit) as e:
+		return in_file, out_file, 0, perf_counter() - start_time, f"{type(e).__name__}: {e}", None, None
+	if line_count is None:
+		return in_file, out_file, 0, perf_counter() - start_time, "File does not exist.", None, None
+	error = None
+	if diagnostics is not None and diagnostics.has_errors():
+		error = f"{diagnostics.error_count} error(s)"
+	return in_file, out_file, line_count, perf_counter() - start_time, error, stats and stats.to_dict(), diagnostics and diagnostics.to_dict()
+
+def parse_files(in_files, out_dir, jobs=1, print_summary=True, **options):
+	"""
+	Transpile many files into the output directory, Using a pool of worker processes.
+	Every file gets its own Symbol table and included libraries.
+	[PARAMETERS]
+	in_files = List of input file names, Or a dict of input file name to its root as returned by collect_input_files.
+	out_dir = Output directory. Each output file is named after its input file, Keeping its path relative to its root. See get_output_path.
+	jobs = Number of worker processes.
+	print_summary = Print the number of files and lines transpiled and the time elapsed. Failed files are always printed.
+	options = Keyword arguments passed to parse_file for every file (auto_reallocate, minified, cache, stream_lines, constant_folding, unroll_threshold, heap_to_stack,
+	string_growth, runtime_string_capacity, line_directives, source_map).
+		The cache is shared by all workers. Pass stats=True to return the statistics of every file,
+		And diagnostics=True to go on after the errors and return every error and warning of every file.
+	[RETURNS] a list of results returned by transpile_job, In the same order as in_files.
+	Raises ValueError If two input files would be written to the same output file, Before transpiling any of them.
+	"""
+	out_files = get_output_paths(in_files, out_dir)
+	for i in set(os.path.dirname(i) for i in out_files):
+		os.makedirs(i, exist_ok=True)
+	start_time = perf_counter()
+	work = [(i, out_file, options) for i, out_file in zip(in_files, out_files)]
+	if jobs <= 1 or len(work) <= 1:
+		results = [transpile_job(i) for i in work]
+	else:
+		from concurrent.futures import ProcessPoolExecutor
+		with ProcessPoolExecutor(max_workers=jobs) as executor:
+			results = list(executor.map(transpile_job, work, chunksize=max(1, len(work) // (jobs * 4))))
+	finish_time = perf_counter()
+
+	failed = [i for i in results if i[4] is not None]
+	for i in failed:
+		print(f"FAILED {i[0]}: {i[4]}")
+	if not print_summary:
+		return results
+	print(" -- Summary -- ")
+	print(f'Files transpiled:\t {len(results) - len(failed)}/{len(results)}\n'
+		  f'Lines processed:\t {sum(i[2] for i in results)}\n'
+		  f'Worker processes:\t {max(1, min(jobs, len(work)))}')
+	print(f'Time elapsed in seconds: {finish_time - start_time:.6f}')
+	print("-"*40)
+	return results
+
+def get_file_signature(file_name):
+	""" Returns the modification time and size of a file, Which change when it's edited. None If it doesn't exist. """
+	try:
+		stat = os.stat(file_name)
+	except FileNotFoundError:
+		return None
+	return stat.st_mtime_ns, stat.st_size
+
+def watch(patterns, output, interval=0.5, debounce=0.2, **options):
+	"""
+	Transpile the input files, Then poll them and transpile again only the files that changed, Until interrupted.
+	New files matching the patterns are picked up too.
+	[PARAMETERS]
+	patterns = Input files, Directories or glob patterns. See collect_input_files.
+	output = The output file If patterns is a single file, Otherwise the output directory.
+	interval = Seconds between each poll.
+	debounce = Seconds without any change to wait for before transpiling, So a burst of saves is transpiled once.
+	options = Keyword arguments passed to parse_file. Pass diagnostics=True to go on after the errors and print every error and warning.
+	"""
+	single_file = len(patterns) == 1 and os.path.isfile(patterns[0])
+	if not single_file:
+		os.makedirs(output, exist_ok=True)
+	signatures = {}
+	pending = set()
+	last_change = 0.0
+	last_error = None
+	print("Watching for changes. Press Ctrl+C to stop.")
+	try:
+		while True:
+			files = collect_input_files(patterns)
+			for i in files:
+				signature = get_file_signature(i)
+				if signature is not None and signatures.get(i) != signature:
+					signatures[i] = signature
+					pending.add(i)
+					last_change = perf_counter()
+			for i in signatures.keys() - set(files): # Deleted files
+				del signatures[i]
+				pending.discard(i)
+			if pending and perf_counter() - last_change >= debounce:
+				out_files = {}
+				if not single_file:
+					try:
+						out_files = dict(zip(files, get_output_paths(files, output)))
+						last_error = None
+					except ValueError as e:
+						if str(e) != last_error:
+							print(f"FAILED: {e}")
+							last_error = str(e)
+						# Keep the changed files, They're transpiled on the first poll after the conflict is resolved.
+						sleep(interval)
+						continue
+				for i in sorted(pending):
+					out_file = output if single_file else out_files[i]
+					os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+					_, _, line_count, elapsed, error, _, diagnostics = transpile_job((i, out_file, options))
+					if diagnostics is not None and diagnostics["diagnostics"]:
+						from diagnostics import DiagnosticCollector
+						print(DiagnosticCollector.from_dict(diagnostics).get_report())
+					if error is None:
+						print(f"Transpiled {i} -> {out_file} ({line_count} lines, {elapsed * 1000:.1f} ms)")
+					else:
+						print(f"FAILED {i}: {error}")
+				pending.clear()
+			sleep(min(interval, debounce) if pending else interval)
+	except KeyboardInterrupt:
+		print("Stopped watching.")
 
 if __name__ == "__main__":
 	# python processor.py -o main.c -i main.sts
-	print("// StoryScript C Transpiler // Version Alpha 1 //")
+	import argparse
 	parser = argparse.ArgumentParser(description="Transpile StoryScript code into C code.")
 	parser.add_argument(
 		"-i", "--input", 
-		help="The input file.", 
-		required=True
+		nargs="+",
+		help="The input file. Multiple files, Directories or glob patterns transpile in batch mode."
 	)
 	parser.add_argument(
 		"-o", "--output", 
-		help="The target output file.", 
-		required=True
+		help="The target output file. The output directory in batch mode."
+	)
+	parser.add_argument(
+		"-j", "--jobs",
+		type=int,
+		default=os.cpu_count() or 1,
+		help="Number of worker processes used in batch mode."
 	)
 	parser.add_argument(
 		"-no-realloc", 
@@ -134,5 +434,213 @@ if __name__ == "__main__":
 		action="store_true",
 		help="Tell the file writer to minify the output file or not."
 	)
+	parser.add_argument(
+		"--no-cache",
+		action="store_true",
+		help="Always transpile, Without reading or writing the build cache."
+	)
+	parser.add_argument(
+		"--cache-dir",
+		default=os.environ.get("STORYSCRIPT_CACHE_DIR", ".sts_cache"),
+		help="The build cache directory."
+	)
+	parser.add_argument(
+		"--cache-size",
+		type=int,
+		default=64,
+		help="Maximum size of the build cache in megabytes."
+	)
+	parser.add_argument(
+		"--stream",
+		type=int,
+		nargs="?",
+		const=4096,
+		metavar="LINES",
+		help="Flush the generated code to disk every LINES lines (Defaults to 4096) to keep memory usage flat on big files."
+	)
+	parser.add_argument(
+		"--no-constant-folding",
+		action="store_true",
+		help="Do not fold constant expressions or remove the if and switch branches that are never taken."
+	)
+	parser.add_argument(
+		"--unroll",
+		type=int,
+		nargs="?",
+		const=16,
+		metavar="STATEMENTS",
+		help="Unroll loopfor loops fully or partially, Up to STATEMENTS statements after unrolling (Defaults to 16)."
+	)
+	parser.add_argument(
+		"--heap-to-stack",
+		action="store_true",
+		help="Move the heap variables that never escape (Only set, Deleted and compared) to the stack. Keeps the whole program in memory."
+	)
+	parser.add_argument(
+		"--string-growth",
+		type=float,
+		default=2.0,
+		metavar="FACTOR",
+		help="Heap strings that are too small grow to at least their capacity times this. 1 to reallocate to the exact length. Defaults to 2."
+	)
+	parser.add_argument(
+		"--runtime-string-capacity",
+		action="store_true",
+		help="Keep the capacity of heap strings in the output code and check it when they are set, Instead of at transpile time."
+	)
+	parser.add_argument(
+		"--line-directives",
+		action="store_true",
+		help="Insert #line directives pointing at the input lines, So debuggers and profilers (gdb, perf, gprof) show the StoryScript lines."
+	)
+	parser.add_argument(
+		"--source-map",
+		action="store_true",
+		help="Write the input line of every output line next to the output file (OUTPUT.map). See sourcemap.py. Skips the build cache."
+	)
+	parser.add_argument(
+		"--stats-json",
+		metavar="PATH",
+		help="Write the time of each phase, Keyword and line counts and the output size as JSON. In batch mode, Per file and in total."
+	)
+	parser.add_argument(
+		"--all-errors",
+		action="store_true",
+		help="Go on after the errors, And print every error and warning at the end instead of stopping at the first error."
+	)
+	parser.add_argument(
+		"--diagnostics-json",
+		metavar="PATH",
+		help="Write every error and warning as JSON (Implies --all-errors). - to write them to the standard output."
+	)
+	parser.add_argument(
+		"--profile",
+		nargs="?",
+		const="sts_profile.folded",
+		metavar="PATH",
+		help="Time the Lexer handlers and each line. Prints the slowest functions and lines, And writes the call stacks to PATH (Defaults to sts_profile.folded) for flamegraph tools."
+	)
+	parser.add_argument(
+		"-q", "--release",
+		action="store_true",
+		help="Fast mode for production and CI. No progress bar, Memory tracking, Debug messages or statistics."
+	)
+	parser.add_argument(
+		"--daemon",
+		nargs="?",
+		const=os.environ.get("STORYSCRIPT_SOCKET", ".sts_daemon.sock"),
+		metavar="SOCKET",
+		help="Serve transpile requests on a Unix domain socket (Defaults to .sts_daemon.sock) instead. See client.py."
+	)
+	parser.add_argument(
+		"--daemon-workers",
+		type=int,
+		default=4,
+		help="Number of requests the daemon transpiles at the same time."
+	)
+	parser.add_argument(
+		"--watch",
+		action="store_true",
+		help="Keep running, And transpile the input files again whenever they change."
+	)
+	parser.add_argument(
+		"--watch-interval",
+		type=float,
+		default=0.5,
+		help="Seconds between each check for changes in watch mode."
+	)
+	parser.add_argument(
+		"--debounce",
+		type=float,
+		default=0.2,
+		help="Seconds without any change to wait for before transpiling in watch mode."
+	)
 	args = parser.parse_args()
-	parse_file(args.output, args.input, not args.no_auto_reallocate, args.minified)
+	if args.daemon is None and (not args.input or not args.output):
+		parser.error("the following arguments are required: -i/--input, -o/--output")
+	if args.string_growth < 1:
+		parser.error("--string-growth must be at least 1")
+	if not args.release:
+		print(f"// StoryScript C Transpiler // Version {TRANSPILER_VERSION} //")
+	build_cache = None
+	if not args.no_cache and not args.profile: # a Cache hit has nothing to profile.
+		build_cache = BuildCache(args.cache_dir, args.cache_size * 1024 * 1024)
+	options = {
+		"auto_reallocate": not args.no_auto_reallocate,
+		"minified": args.minified,
+		"cache": build_cache,
+		"stream_lines": args.stream,
+		"constant_folding": not args.no_constant_folding,
+		"unroll_threshold": args.unroll,
+		"heap_to_stack": args.heap_to_stack,
+		"string_growth": args.string_growth,
+		"runtime_string_capacity": args.runtime_string_capacity,
+		"line_directives": args.line_directives,
+		"source_map": args.source_map
+	}
+	if args.stats_json:
+		from transpilestats import TranspileStats, sum_stats, write_stats_json
+	collect_diagnostics = args.all_errors or args.diagnostics_json is not None
+	if collect_diagnostics:
+		from diagnostics import DiagnosticCollector, write_diagnostics_json
+	if args.daemon is not None:
+		from daemon import run_daemon
+		del options["cache"], options["stream_lines"], options["line_directives"], options["source_map"]
+		if not args.release:
+			print(f"Serving on {args.daemon}")
+		run_daemon(args.daemon, options, args.daemon_workers)
+	elif args.watch:
+		watch(args.input, args.output, args.watch_interval, args.debounce, diagnostics=collect_diagnostics, **options)
+	elif len(args.input) == 1 and os.path.isfile(args.input[0]):
+		stats = None
+		if args.stats_json:
+			stats = TranspileStats(args.input[0], args.output)
+		profiler = None
+		if args.profile:
+			from profiler import Profiler
+			profiler = Profiler()
+		diagnostics = None
+		if collect_diagnostics:
+			diagnostics = DiagnosticCollector(args.input[0])
+		parse_file(args.output, args.input[0], quiet=args.release, stats=stats, profiler=profiler, diagnostics=diagnostics, **options)
+		if stats is not None:
+			write_stats_json(args.stats_json, stats.to_dict())
+		if diagnostics is not None:
+			if args.diagnostics_json is not None:
+				write_diagnostics_json(args.diagnostics_json, diagnostics.to_dict())
+			if args.diagnostics_json != "-" and (diagnostics.diagnostics or not args.release):
+				print(diagnostics.get_report())
+			if diagnostics.has_errors():
+				raise SystemExit(1)
+		if profiler is not None:
+			print(" -- Profile -- ")
+			print(profiler.get_report())
+			profiler.write_collapsed_stacks(args.profile)
+			print(f"Call stacks written to {args.profile}")
+	else:
+		if args.profile:
+			parser.error("--profile only works with a single input file.")
+		input_files = collect_input_files(args.input)
+		if not input_files:
+			parser.error("No input files found.")
+		try:
+			results = parse_files(input_files, args.output, args.jobs, not args.release, stats=bool(args.stats_json), diagnostics=collect_diagnostics, **options)
+		except ValueError as e:
+			parser.error(str(e))
+		if args.stats_json:
+			files = [i[5] for i in results if i[5] is not None]
+			write_stats_json(args.stats_json, {"files": files, "totals": sum_stats(files)})
+		if collect_diagnostics:
+			files = [i[6] for i in results if i[6] is not None]
+			if args.diagnostics_json is not None:
+				write_diagnostics_json(args.diagnostics_json, {
+					"files": files,
+					"errors": sum(i["errors"] for i in files),
+					"warnings": sum(i["warnings"] for i in files)
+				})
+			if args.diagnostics_json != "-":
+				for i in files:
+					if i["diagnostics"]:
+						print(DiagnosticCollector.from_dict(i).get_report())
+		if any(i[4] is not None for i in results):
+			raise SystemExit(1)
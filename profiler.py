@@ -0,0 +1,112 @@
+from time import perf_counter
+from functools import wraps
+import heapq
+
+# Lexer methods timed by the Profiler, On top of the keyword handlers.
+LEXER_METHODS = (
+	"analyseCommand", "variable_setting", "parse_value", "parse_statements", "parse_if", "parse_loopfor", "parse_switch",
+	"parse_condition", "get_dynamic_value"
+)
+
+class FunctionStats:
+	__slots__ = ("calls", "cumulative", "self_time")
+
+	def __init__(self):
+		self.calls = 0
+		self.cumulative = 0.0 # Seconds, Including the functions it called
+		self.self_time = 0.0 # Seconds, Excluding the functions it called
+
+class Profiler:
+	"""
+	Times the functions it wraps and the lines of the input file.
+	Only the functions wrapped with wrap() or instrument() are timed, Nothing is timed without a Profiler.
+	[PARAMETER] top_lines: Number of slowest lines to keep.
+	"""
+	def __init__(self, top_lines=20):
+		self.functions = {} # Function name to FunctionStats
+		self.stacks = {} # Collapsed stack ("a;b;c") to self time in seconds
+		self.stack = [] # Names of the running wrapped functions
+		self.child_times = [] # Time spent in the functions called by each running function
+		self.top_lines = top_lines
+		self.slowest_lines = [] # Heap of (seconds, line number, source)
+		self.line_start = 0.0
+
+	def wrap(self, name, function):
+		""" Returns the function wrapped to record its time under the name. """
+		stack = self.stack
+		child_times = self.child_times
+		stats = self.functions.setdefault(name, FunctionStats())
+
+		@wraps(function)
+		def wrapper(*args, **kwargs):
+			recursive = name in stack
+			stack.append(name)
+			child_times.append(0.0)
+			start = perf_counter()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				elapsed = perf_counter() - start
+				self_time = elapsed - child_times.pop()
+				key = ";".join(stack)
+				stack.pop()
+				if child_times:
+					child_times[-1] += elapsed
+				stats.calls += 1
+				stats.self_time += self_time
+				if not recursive:
+					stats.cumulative += elapsed
+				self.stacks[key] = self.stacks.get(key, 0.0) + self_time
+		return wrapper
+
+	def instrument(self, obj, names):
+		""" Replace the methods of the object with wrapped ones. Calls from the object to itself are timed too. """
+		for name in names:
+			setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+	def instrument_lexer(self, lexer):
+		""" Time the keyword handlers and the main parsing methods of a Lexer. """
+		wrapped = {}
+		for keyword, handler in lexer.keyword_handlers.items():
+			name = handler.__name__
+			if name not in wrapped:
+				wrapped[name] = self.wrap(name, handler)
+				setattr(lexer, name, wrapped[name])
+			lexer.keyword_handlers[keyword] = wrapped[name]
+		self.instrument(lexer, LEXER_METHODS)
+
+	def begin_line(self):
+		self.line_start = perf_counter()
+
+	def end_line(self, line_number, source):
+		""" Record the time of the line started by begin_line. """
+		entry = (perf_counter() - self.line_start, line_number, source)
+		if len(self.slowest_lines) < self.top_lines:
+			heapq.heappush(self.slowest_lines, entry)
+		elif entry[0] > self.slowest_lines[0][0]:
+			heapq.heapreplace(self.slowest_lines, entry)
+
+	def get_report(self):
+		""" Returns the text table of the functions sorted by self time, And the slowest lines. """
+		total = sum(i.self_time for i in self.functions.values()) or 1.0
+		out = [f"{'Function':<28} {'Calls':>9} {'Cumulative s':>13} {'Self s':>10} {'Self %':>7}"]
+		for name, stats in sorted(self.functions.items(), key=lambda i: i[1].self_time, reverse=True):
+			if stats.calls == 0:
+				continue
+			out.append(f"{name:<28} {stats.calls:>9} {stats.cumulative:>13.6f} {stats.self_time:>10.6f} {stats.self_time / total * 100:>6.1f}%")
+		out.append("")
+		out.append(f"{'Line':>7} {'Seconds':>10}  Source")
+		for seconds, line_number, source in sorted(self.slowest_lines, reverse=True):
+			source = source.strip()
+			if len(source) > 60:
+				source = source[:57] + "..."
+			out.append(f"{line_number:>7} {seconds:>10.6f}  {source}")
+		return "\n".join(out)
+
+	def write_collapsed_stacks(self, path):
+		""" Write the self time of every call stack in microseconds, In the collapsed stack format read by flamegraph tools. """
+		with open(path, "w") as f:
+			for stack, seconds in sorted(self.stacks.items()):
+				microseconds = round(seconds * 1e6)
+				if microseconds > 0:
+					f.write(f"{stack} {microseconds}\n")
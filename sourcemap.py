@@ -0,0 +1,112 @@
+from bisect import bisect_right
+import argparse
+import json
+import sys
+import os
+import re
+
+# Source map written next to the output file by processor.py --source-map:
+#   version = SOURCE_MAP_VERSION
+#   file = The C file
+#   source = The StoryScript file
+#   lines = List of [C line, StoryScript line] where the StoryScript line changes, Sorted by C line.
+#     Each StoryScript line covers the C lines until the next one. The C lines before the first one are the header.
+
+SOURCE_MAP_VERSION = 1
+PERCENT_REGEX = re.compile(r"^\s*(\d+(?:\.\d+)?)%?\s") # The first column of perf and gprof reports, With or without %
+
+def write_source_map(path, out_file, source_file, lines):
+	""" Write a source map. lines is the list returned by TranspileContext.get_source_map. """
+	with open(path, "w") as f:
+		json.dump({"version": SOURCE_MAP_VERSION, "file": out_file, "source": source_file, "lines": lines}, f)
+
+class SourceMap:
+	"""
+	Finds the StoryScript line of the lines of a C file.
+	[PARAMETER] path: Path of the source map file.
+	"""
+	def __init__(self, path):
+		with open(path, "r") as f:
+			data = json.load(f)
+		if data.get("version") != SOURCE_MAP_VERSION:
+			raise ValueError(f"Unsupported source map version: {data.get('version')}")
+		self.out_file = data["file"]
+		self.source_file = data["source"]
+		self.c_lines = [i[0] for i in data["lines"]]
+		self.source_lines = [i[1] for i in data["lines"]]
+		# "main.c:12" in a report, With the C file named by its path or its base name.
+		names = sorted({self.out_file, os.path.basename(self.out_file)}, key=len, reverse=True)
+		self.location_regex = re.compile(r"(?<![\w./\\-])(?:" + "|".join(re.escape(i) for i in names) + r"):(\d+)")
+
+	def get_source_line(self, c_line):
+		""" Returns the StoryScript line of a C line. None If it's in the header. """
+		index = bisect_right(self.c_lines, c_line) - 1
+		if index < 0:
+			return None
+		return self.source_lines[index]
+
+	def replace_location(self, match):
+		line = self.get_source_line(int(match.group(1)))
+		if line is None: # The header holds the runtime functions
+			return match.group()
+		return f"{self.source_file}:{line}"
+
+	def rewrite(self, text):
+		""" Returns the report with its "file.c:LINE" locations replaced by "file.sts:LINE". """
+		return self.location_regex.sub(self.replace_location, text)
+
+	def summarize(self, text):
+		"""
+		Add up the percentage of every line of the report naming a C line, By StoryScript line.
+		Fits reports with one location per line, Like "perf report --sort srcline" or "gprof -l".
+		[RETURNS] a list of (Percentage, StoryScript line, Number of report lines) sorted by percentage.
+		"""
+		totals = {}
+		for i in text.splitlines():
+			location = self.location_regex.search(i)
+			percent = PERCENT_REGEX.match(i)
+			if location is None or percent is None:
+				continue
+			line = self.get_source_line(int(location.group(1)))
+			if line is None:
+				continue
+			total = totals.get(line, (0.0, 0))
+			totals[line] = (total[0] + float(percent.group(1)), total[1] + 1)
+		return sorted(((percent, line, count) for line, (percent, count) in totals.items()), reverse=True)
+
+if __name__ == "__main__":
+	# perf report --stdio --sort srcline | python sourcemap.py main.c.map
+	# gprof -l main gmon.out | python sourcemap.py main.c.map --summary
+	parser = argparse.ArgumentParser(description="Rewrite the C lines of a profiler report (perf, gprof and so on) into StoryScript lines.")
+	parser.add_argument("map", help="The source map written by processor.py --source-map.")
+	parser.add_argument("report", nargs="?", default="-", help="The report file. - or missing to read the standard input.")
+	parser.add_argument("-o", "--output", help="Write the rewritten report to this file instead of the standard output.")
+	parser.add_argument("--summary", action="store_true", help="Print the percentage of each StoryScript line instead, With its source.")
+	args = parser.parse_args()
+
+	source_map = SourceMap(args.map)
+	if args.report == "-":
+		report = sys.stdin.read()
+	else:
+		with open(args.report, "r") as f:
+			report = f.read()
+	if args.summary:
+		try:
+			with open(source_map.source_file, "r") as f:
+				source = f.read().splitlines()
+		except OSError:
+			source = []
+		out = [f"{'Percent':>8} {'Line':>7} {'Entries':>8}  Source"]
+		for percent, line, count in source_map.summarize(report):
+			text = source[line - 1].strip() if line <= len(source) else ""
+			if len(text) > 60:
+				text = text[:57] + "..."
+			out.append(f"{percent:>7.2f}% {line:>7} {count:>8}  {text}")
+		result = "\n".join(out) + "\n"
+	else:
+		result = source_map.rewrite(report)
+	if args.output:
+		with open(args.output, "w") as f:
+			f.write(result)
+	else:
+		sys.stdout.write(result)
@@ -0,0 +1,13 @@
+from transpiler import transpile
+import unittest
+
+class LineDirectivesTest(unittest.TestCase):
+	def test_end_of_main_belongs_to_last_statement(self):
+		source = 'dynamic h = new Dynamic (75)\nint a = 1\nprint ("done")\n'
+		lines = transpile(source, {"line_directives": "main.sts"}).splitlines()
+		free_index = next(i for i, line in enumerate(lines) if "__sts_dynamic_free(&h);" in line)
+		directive = next(line for line in reversed(lines[:free_index]) if line.startswith("#line"))
+		self.assertEqual(directive, '#line 3 "main.sts"')
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,126 @@
+from sys import intern
+from string import ascii_letters, digits
+from langEnums import TokenType
+import re
+
+# All Keywords of the language. Keyword tokens share these interned strings.
+KEYWORDS = frozenset(intern(i) for i in (
+	"if", "else", "then", "end", "and", "or",
+	"var", "int", "bool", "float", "list", "dictionary",
+	"tuple", "dynamic", "string", "const", "override", "heap", "new",
+	"func", "print", "input", "throw", "del", "namespace",
+	"#define", "loopfor", "switch", "case", "break", "default", "exit"
+))
+
+# Each match is the whitespace before a token and the token itself.
+TOKEN_REGEX = re.compile(r"""
+	(\s*)
+	(//.*
+	|"[^"\\]*(?:\\.[^"\\]*)*"?
+	|\#?[A-Za-z_]\w*
+	|\d+(?:\.\d*)?|\.\d+
+	|&&|\|\||[=!<>+\-*/%]=|[-+*/%<>=!&|]
+	|[()\[\]{}:,;]
+	|\S)
+""", re.VERBOSE)
+
+# The token type of a token, Found from its first character.
+FIRST_CHARACTER_TYPES = {}
+for i in ascii_letters + "_#":
+	FIRST_CHARACTER_TYPES[i] = TokenType.Name
+for i in digits + ".":
+	FIRST_CHARACTER_TYPES[i] = TokenType.Number
+for i in "&|=!<>+-*/%":
+	FIRST_CHARACTER_TYPES[i] = TokenType.Operator
+for i in "()[]{}:,;":
+	FIRST_CHARACTER_TYPES[i] = TokenType.Punctuation
+FIRST_CHARACTER_TYPES['"'] = TokenType.String
+
+class Token:
+	__slots__ = ("type", "value", "line", "column")
+
+	def __init__(self, tokentype, value, line, column):
+		self.type = tokentype
+		self.value = value
+		self.line = line
+		self.column = column
+
+	@property
+	def end(self):
+		""" Returns the column right after the last character of the token. """
+		return self.column + len(self.value)
+
+	def __repr__(self):
+		return f"Token({self.type.name}, {self.value!r}, {self.line}:{self.column})"
+
+# Token value to (interned value, Token type). Lines repeat the same names and keywords a lot,
+# So most tokens skip the classification. Cleared when full so unique values can't grow it forever.
+TOKEN_CACHE_SIZE = 1 << 16
+token_cache = {}
+
+def classify_token(value):
+	""" Returns the interned value and the Token type of a token value. """
+	tokentype = FIRST_CHARACTER_TYPES.get(value[0], TokenType.Unknown)
+	if tokentype is TokenType.Name:
+		value = intern(value)
+		if value in KEYWORDS:
+			tokentype = TokenType.Keyword
+		elif value == "#":
+			tokentype = TokenType.Unknown
+	elif tokentype is TokenType.Operator:
+		if value.startswith("//"):
+			tokentype = TokenType.Comment
+	elif tokentype is TokenType.Number and value == ".":
+		tokentype = TokenType.Unknown
+	return value, tokentype
+
+def tokenize_line(line, line_number=0):
+	""" Split a line of StoryScript code into a list of Tokens. """
+	tokens = []
+	append = tokens.append
+	cache = token_cache
+	column = 0
+	for space, value in TOKEN_REGEX.findall(line):
+		column += len(space)
+		cached = cache.get(value)
+		if cached is None:
+			if len(cache) >= TOKEN_CACHE_SIZE:
+				cache.clear()
+			cached = cache[value] = classify_token(value)
+		value, tokentype = cached
+		append(Token(tokentype, value, line_number, column))
+		column += len(value)
+	return tokens
+
+def tokenize(lines):
+	""" Tokenize the lines provided. Yields a list of Tokens for each line. """
+	line_number = 0
+	for line in lines:
+		line_number += 1
+		yield tokenize_line(line, line_number)
+
+def join_tokens(tokens):
+	"""
+	Returns the source text the tokens were read from, Keeping the spacing between them.
+	Tokens from different lines are separated with a single space.
+	"""
+	if not tokens:
+		return ""
+	previous = tokens[0]
+	if len(tokens) == 1:
+		return previous.value
+	out = [previous.value]
+	for i in tokens[1:]:
+		if i.line != previous.line:
+			out.append(" ")
+		elif i.column > previous.end:
+			out.append(" " * (i.column - previous.end))
+		out.append(i.value)
+		previous = i
+	return "".join(out)
+
+def get_parenthesized(tokens):
+	""" Returns the tokens inside the parentheses around the tokens. None If the tokens are not in parentheses. """
+	if len(tokens) < 2 or tokens[0].value != "(" or tokens[-1].value != ")":
+		return None
+	return tokens[1:-1]
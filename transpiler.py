@@ -0,0 +1,121 @@
+from lexer import Lexer, SymbolTable, TranspileError
+from cgenerator import CGenerator
+from optimizer import ConstantFolder, LoopUnroller, HeapDemoter
+from tokenizer import tokenize_line
+from langEnums import TokenType, Severity
+
+class TranspileContext:
+	"""
+	All the state of a single transpile: The Symbol table, The Lexer, The optimizer passes and the CGenerator.
+	Contexts share nothing, So different threads can transpile with different contexts at the same time.
+	[PARAMETERS]
+	out_file = Output file name. None to keep the output in memory, See get_output.
+	auto_reallocate = Turn on auto memory reallocation in the Output code or not.
+	minified = Tell the file writer to minify the file or not.
+	stream_lines = Flush the generated code to out_file every time this many lines are generated. None to keep it in memory.
+	constant_folding = Fold constant expressions and remove the if and switch branches that are never taken.
+	unroll_threshold = Unroll loopfor loops up to this many statements after unrolling. None to keep the loops.
+	heap_to_stack = Move the heap variables that never escape to the stack. The whole program is kept in memory
+		until finish() for this, Because a variable can only be moved after all its uses are known.
+	string_growth = Heap strings that are too small grow to at least their capacity times this. 1 to reallocate to the exact length.
+	runtime_string_capacity = Check the capacity of heap strings in the output code, Instead of at transpile time.
+	symbol_table = The SymbolTable to use. Defaults to a new one.
+	print_errors = Print the transpilation errors and exit. If off, a TranspileError is raised instead.
+	diagnostics = a DiagnosticCollector to record every error and warning into. Errors don't stop the transpile then,
+		The statement, Line or block with the error is skipped. None to stop at the first error.
+	line_directives = Source file name to point #line directives at, So debuggers and profilers show the StoryScript lines. None to not insert them.
+	source_map = Record the source line of every line of C code. See get_source_map.
+	"""
+	def __init__(self, out_file=None, auto_reallocate=True, minified=False, stream_lines=None, constant_folding=True, unroll_threshold=None, heap_to_stack=False, string_growth=2.0, runtime_string_capacity=False, symbol_table=None, print_errors=True, diagnostics=None, line_directives=None, source_map=False):
+		if symbol_table is None:
+			symbol_table = SymbolTable()
+		self.symbol_table = symbol_table
+		self.minified = minified
+		self.diagnostics = diagnostics
+		self.lexer = Lexer(
+			symbol_table, auto_reallocate=auto_reallocate, print_errors=print_errors and diagnostics is None, string_growth=string_growth,
+			runtime_string_capacity=runtime_string_capacity, diagnostics=diagnostics
+		)
+		self.generator = CGenerator(out_file, stream_lines=stream_lines, string_growth=string_growth, line_directives=line_directives, source_map=source_map)
+		self.generator.file_helper.minified = minified
+		self.folder = ConstantFolder() if constant_folding else None
+		self.unroller = LoopUnroller(unroll_threshold) if unroll_threshold else None
+		self.nodes = [] if heap_to_stack else None # Statements waiting for the whole program optimizations
+
+	def process_tokens(self, commands, line_number):
+		""" Parse, Optimize and generate the C code of a line from its Tokens. """
+		if self.minified and len(commands) != 0 and commands[0].type == TokenType.Comment:
+			return
+		if self.diagnostics is None:
+			self.generate_line(commands, line_number)
+			return
+		try:
+			self.generate_line(commands, line_number)
+		except TranspileError as e:
+			self.diagnostics.add_error(e, commands[0] if commands else None)
+		except Exception as e:
+			self.diagnostics.add_exception(e, line_number)
+
+	def generate_line(self, commands, line_number):
+		node = self.lexer.parse_line(commands, line_number)
+		if node is None: # Inside a block spanning many lines
+			return
+		if self.folder is not None:
+			node = self.folder.optimize(node)
+		if self.unroller is not None:
+			node = self.unroller.optimize(node)
+		if self.nodes is not None:
+			self.nodes.append(node)
+			return
+		self.generator.generate(node)
+
+	def process_line(self, line, line_number):
+		""" Transpile a line of StoryScript code. """
+		self.process_tokens(tokenize_line(line, line_number), line_number)
+
+	def finish(self):
+		""" End the main function and insert the included libraries and the runtime functions. Call once after the last line. """
+		self.finish_body()
+		self.generator.write_header()
+
+	def finish_body(self):
+		""" Generate the lines kept until the end of the file and end the main function. finish() without the header. """
+		try:
+			self.lexer.end_of_file()
+		except TranspileError as e:
+			if self.diagnostics is None:
+				raise
+			self.diagnostics.add_error(e)
+		if self.nodes is not None:
+			for node in HeapDemoter().optimize(self.nodes):
+				self.generator.generate(node)
+			self.nodes = None
+		self.generator.generate_end()
+
+	def get_output(self):
+		""" Returns the C code. """
+		return self.generator.file_helper.get_data()
+
+	def get_source_map(self):
+		""" Returns the list of (C line, Source line) where the source line changes. See FileHelper.get_source_map. Call after finish(). """
+		return self.generator.file_helper.get_source_map()
+
+def transpile(source, options=None, diagnostics=None):
+	"""
+	Transpile StoryScript code into C code in memory, Without reading or writing any file.
+	Every call has its own TranspileContext, So it's safe to call from many threads at the same time.
+	[PARAMETER] source: The StoryScript code.
+	[PARAMETER] options: Dict of TranspileContext options (auto_reallocate, minified, constant_folding, unroll_threshold, heap_to_stack,
+		string_growth, runtime_string_capacity, line_directives).
+	[PARAMETER] diagnostics: a DiagnosticCollector to record every error and warning into before raising the first error. None to stop at the first error.
+	[RETURNS] The C code.
+	Raises TranspileError If the code can't be transpiled.
+	"""
+	context = TranspileContext(print_errors=False, diagnostics=diagnostics, **(options or {}))
+	for line_number, line in enumerate(source.splitlines(), 1):
+		context.process_line(line, line_number)
+	context.finish()
+	if diagnostics is not None and diagnostics.has_errors():
+		error = next(i for i in diagnostics.diagnostics if i.severity is Severity.Error)
+		raise TranspileError(error.message, error.line or "Unknown", None if error.column is None else error.column - 1)
+	return context.get_output()
@@ -0,0 +1,91 @@
+from langEnums import TokenType
+import json
+
+PHASES = ("read", "tokenize", "lex_generate", "header", "write")
+
+class TranspileStats:
+	"""
+	Counters and per-phase times of a single parse_file call.
+	[PHASES]
+	read = Reading the lines of the input file
+	tokenize = Splitting the lines into Tokens
+	lex_generate = Parsing the Tokens, Optimizing and generating the C code, Including the end of the file (TranspileContext.finish_body)
+	header = Inserting the included libraries and the runtime functions
+	write = Writing the output file (FileHelper.write_data_to_file)
+	"""
+	__slots__ = ("file_name", "out_file", "cache_hit", "phases", "keywords", "total_lines", "code_lines", "comment_lines", "empty_lines", "emitted_bytes")
+
+	def __init__(self, file_name=None, out_file=None):
+		self.file_name = file_name
+		self.out_file = out_file
+		self.cache_hit = False
+		self.phases = dict.fromkeys(PHASES, 0.0) # Phase name to seconds
+		self.keywords = {} # Keyword starting a statement to number of statements, Counted by the Lexer. See count_keywords.
+		self.total_lines = 0
+		self.code_lines = 0
+		self.comment_lines = 0
+		self.empty_lines = 0
+		self.emitted_bytes = 0
+
+	def count_command(self, tokens):
+		""" Count a line of the input from its Tokens. """
+		self.total_lines += 1
+		if not tokens:
+			self.empty_lines += 1
+		elif tokens[0].type == TokenType.Comment:
+			self.comment_lines += 1
+		else:
+			self.code_lines += 1
+
+	def count_keywords(self, lexer):
+		"""
+		Count the keywords starting the statements parsed by the Lexer from now on.
+		Statements inside block bodies and after "&&" are counted too, Not only the first one of each line.
+		"""
+		lexer.keyword_counts = self.keywords
+
+	def to_dict(self):
+		return {
+			"file": self.file_name,
+			"output": self.out_file,
+			"cache_hit": self.cache_hit,
+			"phases": dict(self.phases),
+			"total_seconds": sum(self.phases.values()),
+			"lines": {
+				"total": self.total_lines,
+				"code": self.code_lines,
+				"comment": self.comment_lines,
+				"empty": self.empty_lines
+			},
+			"keywords": dict(sorted(self.keywords.items())),
+			"emitted_bytes": self.emitted_bytes
+		}
+
+def sum_stats(files):
+	""" Returns the totals of a list of dicts made by TranspileStats.to_dict. """
+	totals = {
+		"files": len(files),
+		"cache_hits": 0,
+		"phases": dict.fromkeys(PHASES, 0.0),
+		"total_seconds": 0.0,
+		"lines": {"total": 0, "code": 0, "comment": 0, "empty": 0},
+		"keywords": {},
+		"emitted_bytes": 0
+	}
+	for i in files:
+		totals["cache_hits"] += i["cache_hit"]
+		for phase, seconds in i["phases"].items():
+			totals["phases"][phase] += seconds
+		totals["total_seconds"] += i["total_seconds"]
+		for kind, count in i["lines"].items():
+			totals["lines"][kind] += count
+		for keyword, count in i["keywords"].items():
+			totals["keywords"][keyword] = totals["keywords"].get(keyword, 0) + count
+		totals["emitted_bytes"] += i["emitted_bytes"]
+	totals["keywords"] = dict(sorted(totals["keywords"].items()))
+	return totals
+
+def write_stats_json(path, data):
+	""" Write the statistics to a JSON file. """
+	with open(path, "w") as f:
+		json.dump(data, f, indent=4)